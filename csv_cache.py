@@ -0,0 +1,237 @@
+import io
+import json
+import os
+import threading
+import time
+from importlib.util import find_spec
+
+from ingest_manifest import IngestManifest, HashingReader, sniff_encoding
+from lazy_import import lazy_module
+
+pd = lazy_module("pandas")
+
+# Feather 캐시는 pyarrow가 있을 때만 사용 (없으면 매번 CSV 파싱)
+HAS_PYARROW = find_spec("pyarrow") is not None
+
+SNIFF_BYTES = 64 * 1024
+# 파싱/타입 축소 규칙이 바뀌면 올려서 기존 캐시 파일을 무효화
+PARSE_VERSION = 1
+
+
+def read_source(path, parse, encoding=None):
+    """
+    Read a source file once: parse(text_file, first_line) runs over a stream that is hashed as it is read.
+    encoding: known encoding (from the manifest), else sniffed from the first SNIFF_BYTES;
+    the file is re-read only if that guess fails to decode. Returns (result, sha256, encoding).
+    """
+    tried = []
+    while True:
+        with open(path, "rb") as raw:
+            reader = HashingReader(raw)
+            prefix = reader.peek_prefix(SNIFF_BYTES)
+            enc = encoding or sniff_encoding(prefix)
+            if enc in tried:
+                enc = next(e for e in ("cp949", "utf-8") if e not in tried)
+            first_line = prefix.split(b"\n", 1)[0].decode(enc, errors="ignore").strip()
+            try:
+                result = parse(io.TextIOWrapper(io.BufferedReader(reader), encoding=enc, newline=""), first_line)
+            except UnicodeDecodeError:
+                tried.append(enc)
+                if len(tried) == 3: raise
+                encoding = None
+                continue
+            return result, reader.hexdigest(), enc
+
+
+def parse_csv(f, first_line, header=None):
+    """ header=None: row 0, or row 1 when the export starts with a 'Version=' line """
+    if header is None:
+        header = 1 if first_line.startswith("Version=") else 0
+    # Broker exports write quantities and amounts as "1,234": parse them as numbers
+    return pd.read_csv(f, header=header, thousands=",")
+
+
+def compact_dtypes(df):
+    """
+    메모리/캐시 크기 축소용 타입 변환 (값은 그대로 유지)
+    - 정수: int32 범위면 int32
+    - 실수: float32로 왕복해도 값이 같을 때만 float32 (금액처럼 큰 값은 float64 유지)
+    - 문자열: 반복이 많은 열(종목코드, 투자자 구분 등)은 category
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s):
+            pass
+        elif pd.api.types.is_integer_dtype(s):
+            if len(s) == 0 or (s.min() >= -2**31 and s.max() < 2**31):
+                s = s.astype("int32")
+        elif pd.api.types.is_float_dtype(s):
+            f32 = s.astype("float32")
+            if f32.astype("float64").equals(s.astype("float64")):
+                s = f32
+        elif pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            values = s.dropna()
+            if len(values) and values.map(type).eq(str).all() and values.nunique() <= len(s) // 2:
+                s = s.astype("category")
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+class CsvCache:
+    """
+    [알파 HQ] 증권사 CSV 파싱 결과 캐시
+    원본 파일의 sha256을 키로 타입이 정리된 DataFrame을 Feather(비압축) 파일로 저장해 두고,
+    같은 내용의 파일을 다시 읽을 때는 CSV 디코딩 대신 메모리 맵 읽기로 돌려준다.
+    파일 경로 -> 해시는 크기/수정시각 인덱스(IngestManifest)로 찾아 재해시도 생략한다.
+    캐시 파일은 prune()이 최근 사용순으로 max_bytes / max_age_days 안에서만 남긴다. (읽을 때 수정시각 갱신)
+    """
+    def __init__(self, cache_dir="csv_cache", max_bytes=256 * 1024 * 1024, max_age_days=30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._index = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def index(self):
+        # 단독 스크립트용 load()에서만 필요 (프로세스 풀 작업자는 열지 않음)
+        with self._lock:
+            if self._index is None:
+                self._index = IngestManifest(os.path.join(self.cache_dir, "index.json"))
+            return self._index
+
+    def _file(self, digest, header):
+        tag = "auto" if header is None else f"h{header}"
+        return os.path.join(self.cache_dir, f"{digest}-{tag}-v{PARSE_VERSION}.feather")
+
+    def get(self, digest, header=None):
+        """ Cached frame for this content hash, or None """
+        if not HAS_PYARROW or not digest:
+            return None
+        target = self._file(digest, header)
+        if not os.path.exists(target):
+            return None
+        try:
+            from pyarrow import feather
+            df = feather.read_table(target, memory_map=True).to_pandas()
+            os.utime(target)  # 최근 사용 표시 (prune은 오래 안 쓴 파일부터 지운다)
+            with self._lock:
+                self.hits += 1
+            return df
+        except Exception as e:
+            print(f"[경고] CSV 캐시 읽기 실패 (재파싱): {os.path.basename(target)} {e}")
+            return None
+
+    def put(self, digest, header, df):
+        """ Store a parsed frame (compact dtypes); returns the compacted frame """
+        df = compact_dtypes(df)
+        if not HAS_PYARROW:
+            return df
+        target = self._file(digest, header)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        try:
+            from pyarrow import feather
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 비압축이어야 읽을 때 메모리 맵으로 바로 열 수 있다
+            feather.write_feather(df, tmp, compression="uncompressed")
+            os.replace(tmp, target)
+        except Exception as e:
+            print(f"[경고] CSV 캐시 저장 실패: {os.path.basename(target)} {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return df
+
+    def prune(self):
+        """
+        캐시 정리 -> 삭제한 파일 수
+        이전 PARSE_VERSION 파일과 max_age_days 동안 쓰지 않은 파일을 지우고,
+        남은 합계가 max_bytes를 넘으면 오래 안 쓴 파일부터 지운다. (동시에 지워진 파일은 무시)
+        """
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return 0
+        suffix = f"-v{PARSE_VERSION}.feather"
+        cutoff = time.time() - self.max_age_days * 86400
+        entries, doomed = [], []
+        for name in names:
+            if not name.endswith(".feather"):
+                continue  # index.json, 기록 중인 .tmp
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not name.endswith(suffix) or st.st_mtime < cutoff:
+                doomed.append(path)
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+        entries.sort(reverse=True)  # 최근 사용순
+        total = 0
+        for _, size, path in entries:
+            total += size
+            if total > self.max_bytes:
+                doomed.append(path)
+        removed = 0
+        for path in doomed:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def read(self, path, digest=None, encoding=None, header=None):
+        """
+        path -> (DataFrame, sha256, encoding)
+        digest를 알고 있고 캐시가 있으면 파일을 열지 않는다. 없으면 한 번 읽어 파싱/해시 후 캐시에 저장.
+        """
+        df = self.get(digest, header)
+        if df is not None:
+            return df, digest, encoding
+        with self._lock:
+            self.misses += 1
+        df, digest, encoding = read_source(path, lambda f, first: parse_csv(f, first, header), encoding)
+        return self.put(digest, header, df), digest, encoding
+
+    def load(self, path, header=None):
+        """ 단독 스크립트용: 크기/수정시각 인덱스로 해시를 찾아 read() 후 인덱스 갱신 """
+        # check()가 준 해시는 현재 내용의 해시 (크기가 달라 생략된 경우만 None -> 파싱하면서 계산)
+        unchanged, digest = self.index.check(path)
+        df, digest, encoding = self.read(path, digest, self.index.encoding_for(digest), header)
+        if not unchanged and HAS_PYARROW:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.index.mark(path, digest, encoding)
+            self.index.save()
+            self.prune()
+        return df
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def cache_dir_from_config():
+    """ config.json paths.csv_cache (기본 csv_cache) """
+    try:
+        with open("config.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("paths", {}).get("csv_cache", "csv_cache")
+    except Exception:
+        return "csv_cache"
+
+
+def get_cache():
+    """ 프로세스 공용 CsvCache """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = CsvCache(cache_dir_from_config())
+        return _default
+
+
+def load_csv(path, header=None):
+    """ 증권사 CSV -> DataFrame (내용이 같으면 캐시에서 메모리 맵으로 읽음) """
+    return get_cache().load(path, header)
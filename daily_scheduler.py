@@ -1,17 +1,76 @@
 import schedule
+import json
 import time
 import subprocess
 import sys
+import traceback
 from datetime import datetime
 
+import scanner_worker
+
+def start_worker(wait=120):
+    """ 상주 스캐너 워커를 백그라운드로 띄우고 준비될 때까지 대기 """
+    if scanner_worker.ping():
+        return True
+    subprocess.Popen([sys.executable, "scanner_worker.py"])
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if scanner_worker.ping():
+            return True
+        time.sleep(1)
+    print(f"[{datetime.now()}] [경고] 스캐너 워커 기동 실패 (실행마다 subprocess로 대체)")
+    return False
+
+def load_run_timeout():
+    """ config.json worker.run_timeout (초, 기본 1800): 워커가 이 시간 안에 응답하지 않으면 subprocess로 대체 """
+    try:
+        with open("config.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("worker", {}).get("run_timeout", 1800)
+    except Exception:
+        return 1800
+
 def run_analysis(mode="daily"):
     print(f"[{datetime.now()}] Triggering {mode} analysis...")
+    t0 = time.perf_counter()
+    try:
+        # 1순위: 상주 워커에 실행 요청 (모듈/커넥션 풀/세션이 이미 준비된 상태)
+        res = scanner_worker.request_run(mode, timeout=load_run_timeout())
+        total_ms = (time.perf_counter() - t0) * 1000
+        print(f"[{datetime.now()}] {mode} run via worker: ok={res.get('ok')} | "
+              f"startup {total_ms - res.get('run_ms', 0):,.0f} ms, run {res.get('run_ms', 0):,.0f} ms "
+              f"(worker warm-up {res.get('startup_ms') or 0:,.0f} ms, run #{res.get('run')})")
+        if res.get("error"):
+            print(f"Error during {mode} run: {res['error']}")
+        return
+    except Exception as e:
+        # 연결 거부(OSError), 실행 중 워커 종료(EOFError), 인증 실패 등 -> 이번 실행은 subprocess로
+        print(f"[{datetime.now()}] [참고] 스캐너 워커 실행 실패 ({type(e).__name__}: {e}) -> subprocess 실행")
+
     try:
         # Use sys.executable to ensure we use the same environment
         subprocess.run([sys.executable, "market_scanner.py", mode], check=True)
+        # subprocess는 기동/실행이 분리되지 않으므로 합계만 보고
+        print(f"[{datetime.now()}] {mode} run via subprocess: {(time.perf_counter() - t0) * 1000:,.0f} ms (startup 포함)")
     except Exception as e:
         print(f"Error during {mode} run: {e}")
 
+    # 다음 실행부터 다시 상주 워커를 쓰도록 재기동 (살아 있으면 그대로 사용)
+    try:
+        start_worker()
+    except Exception:
+        traceback.print_exc()
+
+_refresh_proc = None
+
+def refresh_universe_history():
+    """ 특징주 스크리닝용 KOSPI/KOSDAQ 시세 이력 증분 수집 (장 마감 후, 스캔/리포트와 분리된 별도 프로세스) """
+    global _refresh_proc
+    if _refresh_proc is not None and _refresh_proc.poll() is None:
+        print(f"[{datetime.now()}] [참고] 이전 유니버스 이력 수집이 아직 실행 중이라 건너뜁니다.")
+        return
+    print(f"[{datetime.now()}] Triggering universe history refresh...")
+    _refresh_proc = subprocess.Popen([sys.executable, "stock_screener.py", "refresh"])
+
 # --- 스케줄링 설정 ---
 
 # 1. 월요일 ~ 금요일: 08:30, 12:00, 16:00
@@ -22,6 +81,11 @@ for t in ["08:30", "12:00", "16:00"]:
     schedule.every().thursday.at(t).do(run_analysis, mode="daily")
     schedule.every().friday.at(t).do(run_analysis, mode="daily")
 
+# 1-1. 월요일 ~ 금요일: 16:30 장 마감 후 유니버스 시세 이력 수집 (다음 스캔의 특징주 스크리닝용)
+for day in (schedule.every().monday, schedule.every().tuesday, schedule.every().wednesday,
+            schedule.every().thursday, schedule.every().friday):
+    day.at("16:30").do(refresh_universe_history)
+
 # 2. 토요일: 12:00 (일일 보고 1회)
 schedule.every().saturday.at("12:00").do(run_analysis, mode="daily")
 
@@ -29,14 +93,19 @@ schedule.every().saturday.at("12:00").do(run_analysis, mode="daily")
 schedule.every().sunday.at("12:00").do(run_analysis, mode="weekly")
 
 print(f"[{datetime.now()}] AI Automation Lab Advanced Scheduler started.")
-print("- Mon-Fri: 08:30, 12:00, 16:00")
+print("- Mon-Fri: 08:30, 12:00, 16:00 (+ 16:30 universe history refresh)")
 print("- Sat: 12:00")
 print("- Sun: 12:00 (Weekly Summary)")
 
 if __name__ == "__main__":
+    start_worker()
     last_heartbeat = 0
     while True:
-        schedule.run_pending()
+        try:
+            schedule.run_pending()
+        except Exception:
+            # 작업 하나가 실패해도 스케줄러는 계속 동작
+            traceback.print_exc()
         
         # 1시간마다 생존 신고 (로그 용)
         current_time = time.time()
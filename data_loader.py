@@ -1,16 +1,33 @@
 import os
 import glob
 import pandas as pd
-import psycopg2
 from psycopg2.extras import execute_values
 import json
 import traceback
 from datetime import datetime
 import csv
+import fnmatch
+import itertools
 import re
+import sys
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import run_trace
+from run_trace import RunTrace
+from db_pool import get_pool, copy_csv
+from ingest_manifest import IngestManifest
+from csv_cache import CsvCache, read_source
+
+def parse_trend_file(path, digest=None, encoding=None, cache_dir="csv_cache"):
+    """ Trend CSV -> (records, sha256, encoding). Module level so a process pool can run it. """
+    df, digest, encoding = CsvCache(cache_dir).read(path, digest, encoding)
+    return BatchLoader._trend_records(df, os.path.basename(path)), digest, encoding
+
 
 class BatchLoader:
-    def __init__(self, base_dir=r"c:\AI_Study_Beginer\1st_PJT_econoAIadvisor"):
+    def __init__(self, base_dir=r"c:\AI_Study_Beginer\1st_PJT_econoAIadvisor", pool=None):
         self.base_dir = base_dir
         with open('config.json', 'r', encoding='utf-8') as f:
             config = json.load(f)
@@ -18,9 +35,53 @@ class BatchLoader:
             # 지휘관 데스크탑 경로 (업무 기준 반영)
             cmd_path = config.get("paths", {}).get("commander_data", r"C:\Users\yjham\Desktop\경제 study")
             self.source_dirs = [self.base_dir, cmd_path]
-    
-    def get_connection(self):
-        return psycopg2.connect(self.db_config['url'])
+            self.manifest_path = config.get("paths", {}).get("ingest_manifest", "ingest_manifest.json")
+            # Parsed frames keyed by source hash (Feather, memory-mapped on re-read)
+            # (kept to batch.csv_cache_mb, least recently used first; unused files expire after batch.csv_cache_days)
+            self.csv_cache = CsvCache(config.get("paths", {}).get("csv_cache", "csv_cache"),
+                                      max_bytes=config.get("batch", {}).get("csv_cache_mb", 256) * 1024 * 1024,
+                                      max_age_days=config.get("batch", {}).get("csv_cache_days", 30))
+            # Batches at or above this size go through COPY + staging merge instead of execute_values
+            self.copy_threshold = config.get("batch", {}).get("copy_threshold", 1000)
+            # Streamed transaction exports are written in batches of this many records
+            self.flush_rows = config.get("batch", {}).get("flush_rows", 5000)
+            # Trend files are parsed in a process pool of this size (None: one per core)
+            self.parse_workers = config.get("batch", {}).get("parse_workers")
+            # ...but only when there is this much to parse: starting workers (spawn on Windows) costs more than small files
+            self.parse_pool_bytes = config.get("batch", {}).get("parse_pool_bytes", 8 * 1024 * 1024)
+        # Shared connection pool (injected by MarketScanner, else the process-wide pool for this DSN)
+        self.pool = pool or get_pool(self.db_config['url'])
+        # Files already ingested with the same size/mtime/hash are skipped
+        self.manifest = IngestManifest(self.manifest_path)
+        self.force = False
+        # Per-ingest source info (path -> digest/encoding), filled while the file is parsed
+        self._sources = {}
+        self.stats = {"ingested": 0, "skipped": 0, "failed": 0}
+        # Connection held for the whole of run(): every source is written in its one transaction
+        self._conn = None
+
+    @contextmanager
+    def _connection(self):
+        """ The run's shared connection inside run() (committed once at the end), else a pooled one """
+        if self._conn is not None:
+            yield self._conn
+        else:
+            with self.pool.connection() as conn:
+                yield conn
+
+    def _savepoint(self, load, *args):
+        """ Run load(*args) -> bool inside a SAVEPOINT of the run's transaction; a failed source is rolled back alone """
+        if self._conn is None:
+            return load(*args)
+        cur = self._conn.cursor()
+        cur.execute("SAVEPOINT batch_source")
+        ok = False
+        try:
+            ok = load(*args)
+        finally:
+            cur.execute("RELEASE SAVEPOINT batch_source" if ok else "ROLLBACK TO SAVEPOINT batch_source")
+            cur.close()
+        return ok
 
     def find_latest_file(self, pattern):
         all_files = []
@@ -33,18 +94,50 @@ class BatchLoader:
         all_files.sort(key=os.path.getmtime, reverse=True)
         return all_files[0]
 
+    def _changed(self, path):
+        """ (changed, known digest); an unchanged file is counted as skipped unless forced """
+        unchanged, digest = self.manifest.check(path)
+        if unchanged and not self.force:
+            print(f"Skipping unchanged {os.path.basename(path)}")
+            self.stats["skipped"] += 1
+            return False, digest
+        return True, digest
+
+    def _ingest(self, path, load):
+        """ Run load(path) unless the manifest says the file is unchanged; load returns success """
+        changed, digest = self._changed(path)
+        if not changed:
+            return
+        self._sources[path] = {"digest": digest}
+        ok = self._savepoint(load, path)
+        source = self._sources.pop(path, {})
+        if ok:
+            self.manifest.mark(path, source.get("digest"), source.get("encoding"))
+            self.stats["ingested"] += 1
+        else:
+            self.stats["failed"] += 1
+
     def _clean_str(self, s):
         """ Remove quotes (' " =), strip whitespace """
         if pd.isna(s): return ""
         return str(s).replace("'", "").replace('"', "").replace('=', "").strip()
 
-    def _read_csv(self, path, header=0):
-        for enc in ['euc-kr', 'utf-8', 'cp949']:
-            try:
-                return pd.read_csv(path, encoding=enc, header=header)
-            except UnicodeDecodeError:
-                continue
-        return pd.read_csv(path, header=header)
+    def _read_source(self, path, parse):
+        """ read_source with the manifest's encoding for a known content hash; records digest/encoding for _ingest """
+        run_trace.record("files", os.path.getsize(path))
+        source = self._sources.get(path, {})  # only tracked inside _ingest
+        result, digest, encoding = read_source(path, parse, self.manifest.encoding_for(source.get("digest")))
+        source.update(digest=digest, encoding=encoding)
+        return result
+
+    def _read_csv(self, path, header=None):
+        """ Parsed frame via the CSV cache (header=None: row 0, or row 1 after a 'Version=' line) """
+        run_trace.record("files", os.path.getsize(path))
+        source = self._sources.get(path, {})  # only tracked inside _ingest
+        digest = source.get("digest")
+        df, digest, encoding = self.csv_cache.read(path, digest, self.manifest.encoding_for(digest), header)
+        source.update(digest=digest, encoding=encoding)
+        return df
 
     def _parse_number(self, s):
         """ Parse number string with commas """
@@ -53,279 +146,386 @@ class BatchLoader:
         except:
             return 0.0
 
+    @staticmethod
+    def _clean_col(df, col):
+        """ Column-wise _clean_str (missing column -> all "") """
+        if col is None or col not in df.columns:
+            return pd.Series("", index=df.index)
+        s = df[col].astype(object)  # cached frames may hold categoricals
+        return s.where(s.notna(), "").astype(str).str.replace(r"['\"=]", "", regex=True).str.strip()
+
+    @staticmethod
+    def _number_col(df, col, strip=","):
+        """ Column-wise _parse_number (unparsable -> 0.0); strip lists extra characters to drop """
+        cleaned = BatchLoader._clean_col(df, col).str.replace(f"[{re.escape(strip)}]", "", regex=True)
+        return pd.to_numeric(cleaned, errors="coerce").astype(float).fillna(0.0)
+
     def sync_portfolio_kr(self):
         f = self.find_latest_file("잔고_국내*.csv")
-        if not f: return
+        if f: self._ingest(f, self._load_portfolio_kr)
+
+    def _load_portfolio_kr(self, f):
         print(f"Syncing KR Portfolio from {f}...")
         
         try:
             df = self._read_csv(f)
-            records = []
-            for _, row in df.iterrows():
-                # Columns: 종목코드, 종목명, 보유량, 매입가
-                code = self._clean_str(row.get('종목코드'))
-                name = self._clean_str(row.get('종목명'))
-                if not code: continue
-                
-                # Ticker formatting
-                if code.isdigit(): 
-                    ticker = f"{code}.KS" # Default to KS, scanner will adjust or check
-                else:
-                    ticker = code
-                
-                qty = self._parse_number(row.get('보유량'))
-                avg_price = self._parse_number(row.get('매입가'))
-                cur_price = self._parse_number(row.get('현재가'))
-                
-                if qty > 0:
-                    records.append((ticker, name, qty, avg_price, cur_price, 'KOSPI', 'KRW')) 
+            # Columns: 종목코드, 종목명, 보유량, 매입가
+            code = self._clean_col(df, '종목코드')
+            # Ticker formatting: default to KS, scanner will adjust or check
+            out = pd.DataFrame({
+                'ticker': code.where(~code.str.isdigit(), code + ".KS"),
+                'name': self._clean_col(df, '종목명'),
+                'qty': self._number_col(df, '보유량'),
+                'avg_price': self._number_col(df, '매입가'),
+                'cur_price': self._number_col(df, '현재가'),
+                'market': 'KOSPI',
+                'currency': 'KRW',
+            })
+            out = out[(code != "") & (out['qty'] > 0)]
+            records = list(out.itertuples(index=False, name=None))
             
-            self._upsert_portfolio(records)
+            ok = self._upsert_portfolio(records)
             # Sync to master_stocks too
             master_records = [(r[0], r[1], r[5]) for r in records]
-            self._upsert_master_stocks(master_records)
+            return self._upsert_master_stocks(master_records) and ok
         except Exception:
             traceback.print_exc()
+            return False
 
     def sync_portfolio_us(self):
         f = self.find_latest_file("잔고_미국*.csv")
-        if not f: return
+        if f: self._ingest(f, self._load_portfolio_us)
+
+    def _load_portfolio_us(self, f):
         print(f"Syncing US Portfolio from {f}...")
         
         try:
-            # Check for header info
-            with open(f, 'r', encoding='euc-kr', errors='ignore') as tf:
-                first = tf.readline()
-            
-            header_row = 1 if 'Version=' in first else 0
-            df = self._read_csv(f, header=header_row)
+            # Header row follows the 'Version=' line if present (detected in the same read)
+            df = self._read_csv(f)
             
-            records = []
-            for _, row in df.iterrows():
-                # Columns: 코드(or 종목코드), 보유량, 매입가
-                code = self._clean_str(row.get('코드')) or self._clean_str(row.get('종목코드'))
-                name = self._clean_str(row.get('종목명'))
-                if not code: continue
-                
-                ticker = code
-                qty = self._parse_number(row.get('보유량'))
-                avg_price = self._parse_number(row.get('매입가')) 
-                cur_price = self._parse_number(row.get('현재가'))
-                
-                if qty > 0:
-                    records.append((ticker, name, qty, avg_price, cur_price, 'US', 'USD')) 
+            # Columns: 코드(or 종목코드), 보유량, 매입가
+            code = self._clean_col(df, '코드')
+            code = code.where(code != "", self._clean_col(df, '종목코드'))
+            out = pd.DataFrame({
+                'ticker': code,
+                'name': self._clean_col(df, '종목명'),
+                'qty': self._number_col(df, '보유량'),
+                'avg_price': self._number_col(df, '매입가'),
+                'cur_price': self._number_col(df, '현재가'),
+                'market': 'US',
+                'currency': 'USD',
+            })
+            out = out[(code != "") & (out['qty'] > 0)]
+            records = list(out.itertuples(index=False, name=None))
             
-            self._upsert_portfolio(records)
+            ok = self._upsert_portfolio(records)
             # Sync to master_stocks too
             master_records = [(r[0], r[1], r[5]) for r in records]
-            self._upsert_master_stocks(master_records)
+            return self._upsert_master_stocks(master_records) and ok
         except Exception:
             traceback.print_exc()
+            return False
 
     def sync_pension(self):
         f = self.find_latest_file("연금_장기자산_*.csv")
-        if not f: return
+        if f: self._ingest(f, self._load_pension)
+
+    def _load_pension(self, f):
         print(f"Syncing Pension Assets from {f}...")
         try:
             df = self._read_csv(f)
-            records = []
-            for _, row in df.iterrows():
-                name = self._clean_str(row.get('종목명'))
-                if not name: continue
-                
-                # yield_str like "10.2%"
-                yield_str = self._clean_str(row.get('수익률')).replace('%', '')
-                yield_val = self._parse_number(yield_str)
-                eval_amt = self._parse_number(row.get('평가금액'))
-                
-                # Estimate avg_price based on yield
-                # current = avg * (1 + yield/100) -> avg = current / (1 + yield/100)
-                avg_price = eval_amt / (1 + yield_val/100) if yield_val != -100 else eval_amt
-                
-                records.append((name, name, 1, avg_price, eval_amt, 'PENSION', 'KRW'))
+            name = self._clean_col(df, '종목명')
+            # yield like "10.2%"
+            yield_val = self._number_col(df, '수익률', strip=",%")
+            eval_amt = self._number_col(df, '평가금액')
+            
+            # Estimate avg_price based on yield
+            # current = avg * (1 + yield/100) -> avg = current / (1 + yield/100)
+            avg_price = (eval_amt / (1 + yield_val / 100)).where(yield_val != -100, eval_amt)
             
-            self._upsert_portfolio(records)
+            out = pd.DataFrame({'ticker': name, 'name': name, 'qty': 1, 'avg_price': avg_price,
+                                'cur_price': eval_amt, 'market': 'PENSION', 'currency': 'KRW'})
+            records = list(out[name != ""].itertuples(index=False, name=None))
+            
+            return self._upsert_portfolio(records)
         except Exception:
             traceback.print_exc()
+            return False
 
     def _upsert_portfolio(self, records):
-        if not records: return
-        conn = None
+        if not records: return True
         try:
-            conn = self.get_connection()
-            cur = conn.cursor()
+            with self._connection() as conn:
+                cur = conn.cursor()
             
-            query = """
-                INSERT INTO portfolio (ticker, name, quantity, avg_price, current_price, market_type, currency)
-                VALUES %s
-                ON CONFLICT (ticker) DO UPDATE 
-                SET quantity = EXCLUDED.quantity, 
-                    avg_price = EXCLUDED.avg_price,
-                    current_price = EXCLUDED.current_price,
-                    market_type = EXCLUDED.market_type, 
-                    updated_at = CURRENT_TIMESTAMP;
-            """
-            execute_values(cur, query, records)
-            conn.commit()
-            print(f"Upserted {len(records)} records to portfolio.")
-            cur.close()
+                query = """
+                    INSERT INTO portfolio (ticker, name, quantity, avg_price, current_price, market_type, currency)
+                    VALUES %s
+                    ON CONFLICT (ticker) DO UPDATE 
+                    SET quantity = EXCLUDED.quantity, 
+                        avg_price = EXCLUDED.avg_price,
+                        current_price = EXCLUDED.current_price,
+                        market_type = EXCLUDED.market_type, 
+                        updated_at = CURRENT_TIMESTAMP;
+                """
+                execute_values(cur, query, records)
+                print(f"Upserted {len(records)} records to portfolio.")
+                cur.close()
+            return True
         except Exception as e:
             print(f"DB Error in portfolio upsert: {e}")
-            if conn: conn.rollback()
-        finally:
-            if conn: conn.close()
+            return False
 
     def _upsert_master_stocks(self, records):
         """ records: List[(ticker, name, market_type)] """
-        if not records: return
-        conn = None
+        if not records: return True
         try:
-            conn = self.get_connection()
-            cur = conn.cursor()
-            query = """
-                INSERT INTO master_stocks (ticker, name, market_type)
-                VALUES %s
-                ON CONFLICT (ticker) DO UPDATE SET name = EXCLUDED.name, market_type = EXCLUDED.market_type, last_updated = CURRENT_TIMESTAMP;
-            """
-            execute_values(cur, query, records)
-            conn.commit()
-            cur.close()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                self._merge_master(cur, records)
+                cur.close()
+            return True
         except:
-            if conn: conn.rollback()
-        finally:
-            if conn: conn.close()
+            return False
+
+    def _merge_master(self, cur, records):
+        # One row per ticker: ON CONFLICT DO UPDATE cannot touch the same row twice in one statement
+        records = list({r[0]: r for r in records}.values())
+        query = """
+            INSERT INTO master_stocks (ticker, name, market_type)
+            VALUES %s
+            ON CONFLICT (ticker) DO UPDATE SET name = EXCLUDED.name, market_type = EXCLUDED.market_type, last_updated = CURRENT_TIMESTAMP;
+        """
+        execute_values(cur, query, records)
 
     def sync_transactions(self):
         # 1. KR Transactions
         f_kr = self.find_latest_file("거래내역*한국*.csv")
         if f_kr: 
-            print(f"Loading KR Transactions from {f_kr}...")
-            self._load_trans_kr(f_kr)
+            self._ingest(f_kr, self._load_trans_kr)
 
         # 2. US Transactions
         f_us = self.find_latest_file("거래내역*미국*.csv")
         if f_us: 
-            print(f"Loading US Transactions from {f_us}...")
-            self._load_trans_us(f_us)
+            self._ingest(f_us, self._load_trans_us)
+
+    def _grouped_rows(self, f, size, header_rows):
+        """
+        Lazily yield logical records of `size` physical CSV rows from an open file.
+        Blank lines are skipped; header_rows(first_row) says how many leading rows to drop.
+        A trailing incomplete group is ignored. Memory stays constant regardless of file size.
+        """
+        rows = csv.reader(line.strip() for line in f if line.strip())
+        first = next(rows, None)
+        if first is None:
+            return
+        skip = header_rows(first)
+        rows = itertools.chain([first], rows)
+        if skip:
+            rows = itertools.islice(rows, skip, None)
+        # zip over the same iterator pulls `size` consecutive rows per group
+        yield from zip(*[rows] * size)
+
+    def _flush_batches(self, records, upsert):
+        """ Feed a record generator to upsert in flush_rows-sized batches; False if any batch failed """
+        ok = True
+        while True:
+            batch = list(itertools.islice(records, self.flush_rows))
+            if not batch:
+                return ok
+            ok = upsert(batch) and ok
+
+    def _trans_kr_records(self, f):
+        """ KR export: 2 rows per trade (row1: date/name/qty/amounts/code, row2: exchange/type/unit price) """
+        header_rows = lambda first: 2 if any("거래일자" in c for c in first) else 0
+        for row1, row2 in self._grouped_rows(f, 2, header_rows):
+            try:
+                date_str = self._clean_str(row1[0]).replace('/', '-').replace('.', '-')
+                ticker = self._clean_str(row1[-1])
+                if ticker.isdigit(): ticker = f"{ticker}.KS"
+
+                trade_type = "기타"
+                for col in row2:
+                    c = self._clean_str(col)
+                    if c and len(c) > 1 and not c.isdigit():
+                        trade_type = c
+                        break
+
+                if not trade_type: trade_type = "Unknown"
+
+                qty = self._parse_number(row1[2])
+                price = self._parse_number(row1[3])
+                if price == 0: price = self._parse_number(row1[4])
+
+                if not ticker: continue
+
+                yield (ticker, date_str, trade_type, qty, price, 'KR', 'KRW')
+            except Exception:
+                continue
+
+    def _trans_us_records(self, f):
+        """ US export: 3 rows per trade (row1: date/type/qty, row2: ticker/description/unit price, row3: exchange/name) """
+        def header_rows(first):
+            if any("Version" in c for c in first): return 4
+            if any("거래일자" in c for c in first): return 3
+            return 0
+        for row1, row2, row3 in self._grouped_rows(f, 3, header_rows):
+            try:
+                date_str = self._clean_str(row1[0]).replace('/', '-').replace('.', '-')
+                ticker = self._clean_str(row2[0])
+                desc = self._clean_str(row2[1])
+
+                qty = self._parse_number(row1[3])
+                price = self._parse_number(row2[2])
+
+                type_r1 = self._clean_str(row1[1])
+                if type_r1 not in ['입출금', '']:
+                    trade_type = f"{type_r1}-{desc}"
+                else:
+                    trade_type = desc
+
+                yield (ticker, date_str, trade_type, qty, price, 'US', 'USD')
+            except Exception:
+                continue
 
     def _load_trans_kr(self, path):
         print(f"Loading KR Transactions from {os.path.basename(path)}...")
-        records = []
         try:
-            with open(path, 'r', encoding='euc-kr') as f:
-                lines = [line.strip() for line in f if line.strip()]
-            
-            start_idx = 0
-            if "거래일자" in lines[0]: start_idx = 2 
-            
-            idx = start_idx
-            while idx < len(lines) - 1:
-                row1 = next(csv.reader([lines[idx]]))
-                row2 = next(csv.reader([lines[idx+1]]))
-                idx += 2
-                
-                try:
-                    date_str = self._clean_str(row1[0]).replace('/', '-').replace('.', '-')
-                    ticker = self._clean_str(row1[-1])
-                    if ticker.isdigit(): ticker = f"{ticker}.KS"
-                    
-                    trade_type = "기타"
-                    for col in row2:
-                        c = self._clean_str(col)
-                        if c and len(c) > 1 and not c.isdigit():
-                            trade_type = c
-                            break
-                    
-                    if not trade_type: trade_type = "Unknown"
-
-                    qty = self._parse_number(row1[2])
-                    price = self._parse_number(row1[3])
-                    if price == 0: price = self._parse_number(row1[4])
-                    
-                    if not ticker: continue
-
-                    records.append((ticker, date_str, trade_type, qty, price, 'KR', 'KRW'))
-                except Exception:
-                    continue
-            
-            self._upsert_transactions(records)
+            return self._read_source(
+                path, lambda f, _: self._flush_batches(self._trans_kr_records(f), self._upsert_transactions))
         except Exception:
             traceback.print_exc()
+            return False
 
     def _load_trans_us(self, path):
         print(f"Loading US Transactions from {os.path.basename(path)}...")
-        records = []
         try:
-            with open(path, 'r', encoding='euc-kr') as f:
-                lines = [line.strip() for line in f if line.strip()]
-            
-            start_idx = 0
-            if "Version" in lines[0]: start_idx = 4
-            elif "거래일자" in lines[0]: start_idx = 3
-            
-            idx = start_idx
-            while idx < len(lines) - 2:
-                row1 = next(csv.reader([lines[idx]]))
-                row2 = next(csv.reader([lines[idx+1]]))
-                row3 = next(csv.reader([lines[idx+2]])) 
-                idx += 3
-                
-                try:
-                    date_str = self._clean_str(row1[0]).replace('/', '-').replace('.', '-')
-                    ticker = self._clean_str(row2[0])
-                    desc = self._clean_str(row2[1]) 
-                    
-                    qty = self._parse_number(row1[3])
-                    price = self._parse_number(row2[2])
-                    
-                    type_r1 = self._clean_str(row1[1])
-                    if type_r1 not in ['입출금', '']:
-                        trade_type = f"{type_r1}-{desc}"
-                    else:
-                        trade_type = desc
-
-                    records.append((ticker, date_str, trade_type, qty, price, 'US', 'USD'))
-                except Exception:
-                    continue
-            
-            self._upsert_transactions(records)
+            return self._read_source(
+                path, lambda f, _: self._flush_batches(self._trans_us_records(f), self._upsert_transactions))
         except Exception:
             traceback.print_exc()
+            return False
 
-    def _upsert_transactions(self, records):
-        if not records: return
-        conn = None
+    # Conflict rules shared by the execute_values and COPY paths
+    TRANS_COLUMNS = ("ticker", "trade_date", "type", "quantity", "price", "market_type", "currency")
+    TRANS_CONFLICT = "ON CONFLICT (ticker, trade_date, type, quantity, price) DO NOTHING"
+    TREND_COLUMNS = ("date", "ticker", "name", "market_type", "investor_type", "trade_type", "quantity", "amount", "rank")
+    TREND_KEY = ("date", "ticker", "investor_type", "trade_type")
+    TREND_CONFLICT = ("ON CONFLICT (date, ticker, investor_type, trade_type) "
+                      "DO UPDATE SET quantity = EXCLUDED.quantity, amount = EXCLUDED.amount, rank = EXCLUDED.rank")
+
+    def _copy_merge(self, cur, table, columns, records, conflict, key=None):
+        """
+        Stream records with COPY FROM STDIN into a staging table, then merge with one INSERT ... SELECT.
+        The staging table is TEMP (never WAL-logged, private to this session, dropped after the merge).
+        key: conflict columns for DO UPDATE merges; duplicate keys in one batch are reduced to one row.
+        """
+        cols = ", ".join(columns)
+        buf = copy_csv(records)
+        nbytes = len(buf.getvalue())
+
+        # Only the loaded columns, with the target's types and no constraints/defaults (no id sequence use)
+        cur.execute(f"CREATE TEMP TABLE {table}_stage ON COMMIT DROP AS SELECT {cols} FROM {table} WITH NO DATA")
+        cur.copy_expert(f"COPY {table}_stage ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+        select = f"SELECT {cols} FROM {table}_stage"
+        if key:
+            # ON CONFLICT DO UPDATE cannot touch the same target row twice in one statement
+            select = f"SELECT DISTINCT ON ({', '.join(key)}) {cols} FROM {table}_stage"
+        cur.execute(f"INSERT INTO {table} ({cols}) {select} {conflict}")
+        # Dropped now rather than at commit: a run can merge into the same table again before committing
+        cur.execute(f"DROP TABLE {table}_stage")
+        run_trace.record("postgres_copy", nbytes)
+
+    def _write_rows(self, cur, table, columns, records, conflict, key=None, label="rows"):
+        """ execute_values for small batches, COPY + staging merge from copy_threshold rows; reports rows/s """
+        use_copy = len(records) >= self.copy_threshold
+        t0 = time.perf_counter()
+        if use_copy:
+            self._copy_merge(cur, table, columns, records, conflict, key)
+        else:
+            execute_values(cur, f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s {conflict};", records)
+        elapsed = time.perf_counter() - t0
+        print(f"Upserted {len(records)} {label} via {'COPY' if use_copy else 'execute_values'} "
+              f"({len(records) / max(elapsed, 1e-6):,.0f} rows/s).")
+
+    def _bulk_write(self, table, columns, records, conflict, key=None, label="rows"):
+        """ _write_rows in its own transaction """
+        if not records: return True
         try:
-            conn = self.get_connection()
-            cur = conn.cursor()
-            
-            query = """
-                INSERT INTO transactions (ticker, trade_date, type, quantity, price, market_type, currency)
-                VALUES %s
-                ON CONFLICT (ticker, trade_date, type, quantity, price) DO NOTHING;
-            """
-            execute_values(cur, query, records)
-            conn.commit()
-            print(f"Inserted {len(records)} transactions.")
-            cur.close()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                self._write_rows(cur, table, columns, records, conflict, key, label)
+                cur.close()
+            return True
         except Exception as e:
-            print(f"DB Error in transactions: {e}")
-            if conn: conn.rollback()
-        finally:
-            if conn: conn.close()
+            print(f"DB Error in {label}: {e}")
+            return False
+
+    def _upsert_transactions(self, records):
+        return self._bulk_write("transactions", self.TRANS_COLUMNS, records, self.TRANS_CONFLICT,
+                                label="transactions")
 
     def sync_market_trends(self):
         # 3. Market Trends (Institutional/Foreigner)
         trend_files = glob.glob(os.path.join(self.base_dir, "*기관*상위*.csv")) + \
                       glob.glob(os.path.join(self.base_dir, "*외국인*상위*.csv"))
-        
+
+        pending = []
         for f in trend_files:
-            self._load_trend_file(f)
+            changed, digest = self._changed(f)
+            if changed:
+                pending.append((f, digest))
+        if not pending: return
 
-    def _load_trend_file(self, path):
-        fname = os.path.basename(path)
-        print(f"Loading Market Trend from {fname}...")
-        
+        # Parse every changed file (in parallel), then write all of them in one transaction
+        parsed = []
+        for path, result in self._parse_trend_files(pending):
+            if result is None:
+                self.stats["failed"] += 1
+            else:
+                parsed.append((path, result))
+        if not parsed: return
+
+        records = [r for _, (recs, _, _) in parsed for r in recs]
+        if self._savepoint(self._write_trends, records):
+            for path, (_, digest, encoding) in parsed:
+                self.manifest.mark(path, digest, encoding)
+            self.stats["ingested"] += len(parsed)
+        else:
+            self.stats["failed"] += len(parsed)
+
+    def _parse_trend_files(self, pending):
+        """ [(path, known digest)] -> [(path, (records, digest, encoding) or None)], in the given order """
+        jobs, total_bytes = [], 0
+        for path, digest in pending:
+            print(f"Loading Market Trend from {os.path.basename(path)}...")
+            size = os.path.getsize(path)
+            run_trace.record("files", size)
+            total_bytes += size
+            jobs.append((path, digest, self.manifest.encoding_for(digest)))
+
+        def outcome(call, *args):
+            try:
+                return call(*args)
+            except BrokenProcessPool:
+                raise  # the whole pool is gone: fall back to in-process parsing below
+            except Exception:
+                traceback.print_exc()
+                return None
+
+        workers = min(len(jobs), self.parse_workers or os.cpu_count() or 1)
+        if workers > 1 and total_bytes >= self.parse_pool_bytes:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    futures = [ex.submit(parse_trend_file, *job, self.csv_cache.cache_dir) for job in jobs]
+                    return [(job[0], outcome(fut.result)) for job, fut in zip(jobs, futures)]
+            except (BrokenProcessPool, OSError) as e:
+                print(f"Process pool unavailable ({e}); parsing trend files in-process.")
+        return [(job[0], outcome(parse_trend_file, *job, self.csv_cache.cache_dir)) for job in jobs]
+
+    @staticmethod
+    def _trend_records(df, fname):
+        """ Trend DataFrame -> [(date, ticker, name, market, investor, trade, qty, amount, rank)] """
         # Determine metadata from filename
         investor = "INSTITUTION" if "기관" in fname else "FOREIGN"
         trade = "BUY" if "매수" in fname else "SELL"
@@ -345,79 +545,161 @@ class BatchLoader:
              # Fallback to today
              ref_date = datetime.now().date()
 
+        code = BatchLoader._clean_col(df, '종목코드')
+        
+        # Simple heuristic: digits -> .KS (.KQ for KOSDAQ files)
+        suffix = ".KQ" if market == "KOSDAQ" else ".KS"
+        ticker = code.where(~code.str.isdigit(), code + suffix)
+
+        # Column names vary: '순매수수량(백주)', '순매도수량(백주)', '순매수량'
+        qty_col = next((c for c in df.columns if '수량' in c), None)
+        amt_col = next((c for c in df.columns if '금액' in c), None)
+        
+        # If SELL file, make sure quantities are positive for storage, 
+        # or negative? Usually stored as absolute magnitude with 'SELL' type.
+        # But in CSV '순매도수량' might be negative or positive.
+        out = pd.DataFrame({
+            'date': ref_date,
+            'ticker': ticker,
+            'name': BatchLoader._clean_col(df, '종목명'),
+            'market': market,
+            'investor': investor,
+            'trade': trade,
+            'qty': BatchLoader._number_col(df, qty_col).abs(),
+            'amount': BatchLoader._number_col(df, amt_col).abs(),
+            # Rank? implied by order? usually sorted. (original row position, before filtering)
+            'rank': range(1, len(df) + 1),
+        })
+        return list(out[code != ""].itertuples(index=False, name=None))
+
+    def _load_trend_file(self, path):
+        """ Single trend file (parsed in-process), written like a one-file batch """
+        print(f"Loading Market Trend from {os.path.basename(path)}...")
         try:
             df = self._read_csv(path)
-            records = []
-            
-            for _, row in df.iterrows():
-                code = self._clean_str(row.get('종목코드'))
-                name = self._clean_str(row.get('종목명'))
-                if not code: continue
-                
-                ticker = f"{code}.KS" if code.isdigit() else code # Simple heuristic
-                if market == "KOSDAQ" and code.isdigit(): ticker = f"{code}.KQ"
-
-                # Column names vary: '순매수수량(백주)', '순매도수량(백주)', '순매수량'
-                qty_col = [c for c in df.columns if '수량' in c]
-                amt_col = [c for c in df.columns if '금액' in c]
-                
-                qty = self._parse_number(row.get(qty_col[0])) if qty_col else 0
-                amount = self._parse_number(row.get(amt_col[0])) if amt_col else 0
-                
-                # If SELL file, make sure quantities are positive for storage, 
-                # or negative? Usually stored as absolute magnitude with 'SELL' type.
-                # But in CSV '순매도수량' might be negative or positive.
-                qty = abs(qty)
-                amount = abs(amount)
-
-                # Rank? implied by order? usually sorted.
-                rank = _ + 1
-                
-                records.append((ref_date, ticker, name, market, investor, trade, qty, amount, rank))
-            
-            self._upsert_market_trends(records)
-            # Sync to master_stocks too
-            master_records = [(r[1], r[2], r[3]) for r in records]
-            self._upsert_master_stocks(master_records)
-
+            return self._write_trends(self._trend_records(df, os.path.basename(path)))
         except Exception:
              traceback.print_exc()
+             return False
 
-    def _upsert_market_trends(self, records):
-        if not records: return
-        conn = None
+    def _write_trends(self, records):
+        """ market_trends and their master_stocks rows in one transaction (all or nothing) """
+        if not records: return True
+        # Later files win for the same (date, ticker, investor, trade), as with file-by-file loading
+        records = list({(r[0], r[1], r[4], r[5]): r for r in records}.values())
         try:
-            conn = self.get_connection()
-            cur = conn.cursor()
-            
-            query = """
-                INSERT INTO market_trends (date, ticker, name, market_type, investor_type, trade_type, quantity, amount, rank)
-                VALUES %s
-                ON CONFLICT (date, ticker, investor_type, trade_type) 
-                DO UPDATE SET quantity = EXCLUDED.quantity, amount = EXCLUDED.amount, rank = EXCLUDED.rank;
-            """
-            execute_values(cur, query, records)
-            conn.commit()
-            print(f"Upserted {len(records)} trends.")
-            cur.close()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                self._write_rows(cur, "market_trends", self.TREND_COLUMNS, records, self.TREND_CONFLICT,
+                                 key=self.TREND_KEY, label="trends")
+                self._merge_master(cur, [(r[1], r[2], r[3]) for r in records])
+                cur.close()
+            return True
         except Exception as e:
             print(f"DB Error in trends: {e}")
-            if conn: conn.rollback()
+            return False
+
+    def _transaction(self, body):
+        """
+        body() over one connection and one transaction: readers see the previous data or all
+        of the new data, never a half-synced portfolio. Each source runs in its own savepoint.
+        Returns False if the commit failed.
+        """
+        try:
+            with self.pool.connection() as conn:
+                self._conn = conn
+                body()
+        except Exception as e:
+            # Nothing was committed: reload the manifest so files marked during this run are retried
+            print(f"DB Error in batch commit: {e}")
+            self.manifest = IngestManifest(self.manifest_path)
+            self.stats["failed"] += self.stats["ingested"]
+            self.stats["ingested"] = 0
+            return False
         finally:
-            if conn: conn.close()
+            self._conn = None
+        self.manifest.save()
+        return True
+
+    def _sync_all(self):
+        # Each source is timed as a sub-stage of the active run trace (if any)
+        with run_trace.stage("batch"):
+            # 1. Portfolio
+            with run_trace.stage("portfolio_kr"): self.sync_portfolio_kr()
+            with run_trace.stage("portfolio_us"): self.sync_portfolio_us()
+            with run_trace.stage("pension"): self.sync_pension()
+            # 2. Transactions
+            with run_trace.stage("transactions"): self.sync_transactions()
+            # 3. Market Trends
+            with run_trace.stage("market_trends"): self.sync_market_trends()
+
+    # Export file name -> loader, for single-file ingestion (export_watcher)
+    SOURCE_PATTERNS = (
+        ("잔고_국내*.csv", "_load_portfolio_kr"),
+        ("잔고_미국*.csv", "_load_portfolio_us"),
+        ("연금_장기자산_*.csv", "_load_pension"),
+        ("거래내역*한국*.csv", "_load_trans_kr"),
+        ("거래내역*미국*.csv", "_load_trans_us"),
+        ("*기관*상위*.csv", "_load_trend_file"),
+        ("*외국인*상위*.csv", "_load_trend_file"),
+    )
+    # Balance snapshots: like run(), only the latest file of each pattern is loaded
+    SNAPSHOT_PATTERNS = ("잔고_국내*.csv", "잔고_미국*.csv", "연금_장기자산_*.csv")
+
+    def _source_pattern(self, path):
+        """ (pattern, method name) for an export file name, or None if it is not a known export """
+        name = os.path.basename(path)
+        if name.startswith(("~$", ".")):
+            return None  # Excel lock files, hidden temp files
+        for pattern, method in self.SOURCE_PATTERNS:
+            if fnmatch.fnmatch(name, pattern):
+                return pattern, method
+        return None
+
+    def loader_for(self, path):
+        """ Bound loader for an export file name, or None if it is not a known export """
+        source = self._source_pattern(path)
+        return getattr(self, source[1]) if source else None
+
+    def ingest_file(self, path, force=False):
+        """ Ingest a single export incrementally (same manifest/transaction rules as run); None if unknown """
+        source = self._source_pattern(path)
+        if source is None:
+            return None
+        pattern, method = source
+        load = getattr(self, method)
+        self.force = force
+        self.stats = {"ingested": 0, "skipped": 0, "failed": 0}
+        if pattern in self.SNAPSHOT_PATTERNS:
+            latest = self.find_latest_file(pattern)
+            if latest is None or os.path.abspath(latest) != os.path.abspath(path):
+                # An older snapshot (e.g. a backup copied in) must not overwrite the current balances
+                print(f"Skipping {os.path.basename(path)}: not the latest {pattern} export.")
+                self.stats["skipped"] += 1
+                return self.stats
+        # Another process (a scan's run) may have ingested files since this loader was created
+        self.manifest = IngestManifest(self.manifest_path)
+        self._transaction(lambda: self._ingest(path, load))
+        self.csv_cache.prune()
+        return self.stats
 
-    def run(self):
+    def run(self, force=False):
+        """ force=True re-ingests every file regardless of the manifest """
         print("Starting Batch Data Load...")
-        # 1. Portfolio
-        self.sync_portfolio_kr()
-        self.sync_portfolio_us()
-        self.sync_pension()
-        # 2. Transactions
-        self.sync_transactions()
-        # 3. Market Trends
-        self.sync_market_trends()
-        print("Batch Load Completed.")
+        self.force = force
+        self.stats = {"ingested": 0, "skipped": 0, "failed": 0}
+        ok = self._transaction(self._sync_all)
+        self.csv_cache.prune()
+        if not ok:
+            return self.stats
+        print(f"Batch Load Completed. (ingested {self.stats['ingested']}, skipped {self.stats['skipped']}, "
+              f"failed {self.stats['failed']})")
+        return self.stats
 
 if __name__ == "__main__":
-    loader = BatchLoader()
-    loader.run()
+    trace = RunTrace("batch").start()
+    try:
+        loader = BatchLoader()
+        loader.run(force="--force" in sys.argv)
+    finally:
+        trace.finish()
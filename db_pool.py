@@ -0,0 +1,101 @@
+import csv
+import io
+import threading
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+import run_trace
+
+# psycopg2 자체는 첫 연결 시점에 import (설치 여부만 미리 확인)
+HAS_PSYCOPG2 = find_spec("psycopg2") is not None
+
+
+class DBPool:
+    """
+    [알파 HQ] 프로세스 공용 PostgreSQL 커넥션 풀
+    with pool.connection() as conn: 블록 단위로 연결을 빌리고 반납한다.
+    블록이 정상 종료되면 commit, 예외가 나면 rollback 후 예외를 그대로 올린다.
+    풀이 가득 차면 오류 대신 반납될 때까지 기다린다.
+    """
+    def __init__(self, dsn, minconn=1, maxconn=8):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def _get_pool(self):
+        if not HAS_PSYCOPG2:
+            raise RuntimeError("psycopg2 모듈이 없어 DB 연결을 사용할 수 없습니다.")
+        with self._lock:
+            if self._pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+                # 실제 연결은 첫 대여 시점에 생성 (모듈 로드만으로 DB에 붙지 않도록)
+                self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
+            return self._pool
+
+    @contextmanager
+    def connection(self):
+        pool = self._get_pool()
+        run_trace.record("postgres")
+        with self._slots:
+            conn = pool.getconn()
+            broken = False
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+                raise
+            finally:
+                pool.putconn(conn, close=broken or bool(conn.closed))
+
+    def closeall(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(dsn, minconn=1, maxconn=8):
+    """ DSN별 프로세스 공용 풀 (같은 DSN이면 같은 풀을 공유) """
+    with _pools_lock:
+        if dsn not in _pools:
+            _pools[dsn] = DBPool(dsn, minconn=minconn, maxconn=maxconn)
+        return _pools[dsn]
+
+
+class _CopyNull:
+    """ csv.QUOTE_NONNUMERIC가 숫자로 보고 따옴표 없이 쓰는 빈 필드 (COPY csv에서 NULL) """
+    __slots__ = ()
+
+    def __float__(self):
+        return 0.0
+
+    def __str__(self):
+        return ""
+
+
+_COPY_NULL = _CopyNull()
+
+
+def copy_csv(records):
+    """
+    COPY ... FROM STDIN WITH (FORMAT csv) 입력 버퍼 (StringIO, 처음 위치)
+    COPY csv는 따옴표 없는 빈 필드를 NULL로 읽으므로 문자열은 모두 따옴표로 감싸 ''를 빈 문자열로,
+    None만 따옴표 없는 빈 필드(NULL)로 쓴다. (execute_values 경로와 같은 값으로 적재)
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, quoting=csv.QUOTE_NONNUMERIC)
+    for row in records:
+        writer.writerow(row if None not in row else [_COPY_NULL if v is None else v for v in row])
+    buf.seek(0)
+    return buf
@@ -1,7 +1,6 @@
 import os
 import json
 import requests
-from notion_client import NotionClient
 from datetime import datetime
 
 def load_config():
@@ -76,6 +75,7 @@ def main():
     if notion_cfg.get('token') and notion_cfg.get('page_summary'):
         print("Sending to Notion...")
         try:
+            from notion_client import NotionClient
             client = NotionClient(
                 token=notion_cfg['token'],
                 page_summary=notion_cfg['page_summary']
@@ -0,0 +1,87 @@
+import threading
+
+import pandas as pd
+
+import run_trace
+from lazy_import import lazy_module
+
+yf = lazy_module("yfinance")  # 실제 다운로드 시점에 로드
+
+
+class DownloadPlanner:
+    """
+    [알파 HQ] yfinance 일괄 다운로드 계획기
+    각 섹션(매크로/코어/포트폴리오/KR 대체조회)이 필요한 심볼을 먼저 등록(require)하면
+    중복을 제거해 한 번의 yf.download로 받아오고, 섹션별로 필요한 종가 열만 잘라서 넘겨준다.
+    store(PriceHistoryStore)가 주어지면 매번 5일치를 받는 대신 로컬 이력의 빠진 봉만 증분 수집한다.
+    """
+    def __init__(self, period="5d", store=None, window=10):
+        self.period = period
+        self.store = store
+        self.window = window  # store 사용 시 섹션에 넘겨줄 최근 봉 개수
+        self.sections = {}
+        self.downloads = 0
+        self._frame = pd.DataFrame()
+        self._fetched = set()
+        self._lock = threading.Lock()
+
+    def require(self, section, symbols):
+        """ 섹션이 필요로 하는 심볼 등록 (실제 다운로드는 execute 시점) """
+        wanted = self.sections.setdefault(section, [])
+        for sym in symbols:
+            if sym not in wanted:
+                wanted.append(sym)
+
+    def pending(self):
+        """ 등록됐지만 아직 받지 않은 심볼 (등록 순서 유지, 중복 제거) """
+        symbols = [s for syms in self.sections.values() for s in syms]
+        return [s for s in dict.fromkeys(symbols) if s not in self._fetched]
+
+    def execute(self, extra=()):
+        """ 대기 중인 심볼 + extra 를 한 번에 다운로드 """
+        with self._lock:
+            symbols = list(dict.fromkeys(self.pending() + [s for s in extra if s not in self._fetched]))
+            if not symbols:
+                return self._frame
+
+            print(f">> yfinance 일괄 다운로드: {len(symbols)}개 심볼 ({', '.join(self.sections) or 'ad-hoc'})")
+            try:
+                close = self._download(symbols)
+                self._frame = pd.concat([self._frame, close], axis=1) if not self._frame.empty else close
+            finally:
+                # 실패한 심볼도 재시도 폭주를 막기 위해 수집 완료로 간주
+                self._fetched.update(symbols)
+                self.downloads += 1
+            return self._frame
+
+    def _download(self, symbols):
+        if self.store is not None:
+            try:
+                self.store.update(symbols)
+            except Exception as e:
+                print(f"[경고] 시세 이력 증분 수집 실패 (로컬 데이터 사용): {e}")
+            return self.store.frame("Close", symbols).tail(self.window)
+
+        close = yf.download(symbols, period=self.period)['Close']
+        run_trace.record_frame("yfinance", close)
+        if isinstance(close, pd.Series):
+            close = close.to_frame(name=symbols[0])
+        return close
+
+    def closes(self, symbols):
+        """ 요청 심볼의 종가 DataFrame (계획에 없던 심볼만 추가 다운로드) """
+        symbols = list(dict.fromkeys(symbols))
+        if any(s not in self._fetched for s in symbols) or self.pending():
+            self.execute(extra=symbols)
+        return self._frame.reindex(columns=symbols)
+
+    def slice(self, section):
+        """ 섹션별 종가 DataFrame """
+        return self.closes(self.sections.get(section, []))
+
+    def reset(self):
+        with self._lock:
+            self.sections = {}
+            self.downloads = 0
+            self._frame = pd.DataFrame()
+            self._fetched = set()
@@ -0,0 +1,209 @@
+import ctypes
+import ctypes.util
+import glob
+import json
+import os
+import select
+import struct
+import sys
+import time
+import traceback
+from datetime import datetime
+
+# inotify 이벤트 마스크 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def load_watcher_config():
+    """ config.json "watcher" 설정 """
+    try:
+        with open("config.json", "r", encoding="utf-8") as f:
+            cfg = json.load(f).get("watcher", {})
+    except Exception:
+        cfg = {}
+    return {
+        "quiet_seconds": cfg.get("quiet_seconds", 3.0),   # 마지막 변경 후 이 시간 동안 그대로면 적재
+        "poll_interval": cfg.get("poll_interval", 2.0),   # 폴링 모드 스캔 주기
+        "backend": cfg.get("backend", "auto"),            # auto / inotify / poll
+    }
+
+
+def list_csvs(dirs):
+    files = []
+    for d in dirs:
+        files.extend(glob.glob(os.path.join(d, "*.csv")))
+    return files
+
+
+class InotifyBackend:
+    """ Linux inotify (ctypes, 추가 패키지 없음): 감시 폴더의 CSV 생성/수정/이동 이벤트 """
+    def __init__(self, dirs):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self.dirs = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch 실패: {d}")
+            self.dirs[wd] = d
+
+    def wait(self, timeout):
+        """ timeout 초 동안 이벤트 대기 -> 변경된 CSV 경로 집합 """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+                name = buf[offset + EVENT_HEADER.size: offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # 이벤트 유실: 폴더 전체를 다시 확인 (변경 없는 파일은 매니페스트가 건너뜀)
+                    changed.update(list_csvs(self.dirs.values()))
+                elif name and wd in self.dirs:
+                    path = os.path.join(self.dirs[wd], os.fsdecode(name))
+                    if path.lower().endswith(".csv"):
+                        changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """ inotify를 쓸 수 없는 환경(Windows 등)용: 주기적으로 크기/수정시각을 비교 """
+    def __init__(self, dirs):
+        self.dirs = dirs
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snap = {}
+        for path in list_csvs(self.dirs):
+            try:
+                st = os.stat(path)
+                snap[path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue  # 스캔 도중 삭제/이름 변경
+        return snap
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+        current = self._scan()
+        changed = {p for p, sig in current.items() if self.snapshot.get(p) != sig}
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class ExportWatcher:
+    """
+    [알파 HQ] 증권사 내보내기 폴더 감시 적재기
+    paths.commander_data 등에 새 잔고/거래내역/수급 CSV가 생기거나 바뀌면,
+    파일 쓰기가 끝나(quiet_seconds 동안 크기/수정시각 변화 없음) 그 파일 하나만
+    BatchLoader.ingest_file 로 바로 적재한다. (스캔/전체 동기화를 기다리지 않음)
+    """
+    def __init__(self, loader, dirs=None, quiet_seconds=3.0, poll_interval=2.0, backend="auto"):
+        self.loader = loader
+        self.dirs = [d for d in (dirs or loader.source_dirs) if os.path.isdir(d)]
+        self.quiet_seconds = quiet_seconds
+        self.poll_interval = poll_interval
+        self.backend_name = backend
+        self.pending = {}  # path -> (stat signature, 마지막 변경 감지 시각)
+        self.ingested = 0
+
+    def _open_backend(self):
+        if self.backend_name in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                return InotifyBackend(self.dirs)
+            except Exception as e:
+                print(f"[경고] inotify 사용 불가, 폴링으로 전환: {e}")
+        return PollingBackend(self.dirs)
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def _note(self, paths):
+        now = time.monotonic()
+        for path in paths:
+            if self.loader.loader_for(path) is None:
+                continue  # 알 수 없는 CSV / 임시 파일
+            self.pending[path] = (self._signature(path), now)
+
+    def _flush_quiet(self):
+        """ 쓰기가 끝난(변화 없는) 대기 파일을 적재 """
+        now = time.monotonic()
+        for path, (sig, seen) in list(self.pending.items()):
+            current = self._signature(path)
+            if current is None:
+                del self.pending[path]  # 삭제되었거나 이름이 바뀜
+            elif current != sig:
+                self.pending[path] = (current, now)  # 아직 쓰는 중
+            elif now - seen >= self.quiet_seconds:
+                del self.pending[path]
+                self._ingest(path)
+
+    def _ingest(self, path):
+        t0 = time.perf_counter()
+        try:
+            stats = self.loader.ingest_file(path)
+        except Exception:
+            traceback.print_exc()
+            return
+        elapsed = (time.perf_counter() - t0) * 1000
+        if stats and stats["ingested"]:
+            self.ingested += 1
+            print(f"[{datetime.now()}] [성공] 내보내기 적재: {os.path.basename(path)} ({elapsed:,.0f} ms)")
+        elif stats and stats["failed"]:
+            print(f"[{datetime.now()}] [경고] 내보내기 적재 실패: {os.path.basename(path)} (다음 변경 시 재시도)")
+
+    def serve(self):
+        if not self.dirs:
+            print("[경고] 감시할 폴더가 없습니다 (config.json paths.commander_data 확인)")
+            return
+        # 감시를 꺼 둔 사이 생긴 파일은 기동 시 한 번 동기화 (변경 없는 파일은 매니페스트가 건너뜀)
+        self.loader.run()
+        backend = self._open_backend()
+        tick = min(self.poll_interval, max(self.quiet_seconds / 2, 0.5))
+        print(f"[{datetime.now()}] 내보내기 폴더 감시 시작 ({type(backend).__name__}): {', '.join(self.dirs)}")
+        try:
+            while True:
+                self._note(backend.wait(tick))
+                self._flush_quiet()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            backend.close()
+            print(f"[{datetime.now()}] 내보내기 폴더 감시 종료 (적재 {self.ingested}건)")
+
+
+if __name__ == "__main__":
+    # 사용법: python export_watcher.py          -> config.json "watcher" 설정대로 감시
+    #         python export_watcher.py --poll   -> inotify 대신 폴링
+    from data_loader import BatchLoader
+
+    cfg = load_watcher_config()
+    if "--poll" in sys.argv:
+        cfg["backend"] = "poll"
+    ExportWatcher(BatchLoader(), **cfg).serve()
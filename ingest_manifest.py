@@ -0,0 +1,162 @@
+import codecs
+import hashlib
+import io
+import json
+import os
+import threading
+from datetime import datetime
+
+from json_store import file_lock
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sniff_encoding(prefix):
+    """ Decide a broker export's encoding from a byte prefix: UTF-8 (BOM or valid non-ASCII) else EUC-KR/CP949 """
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    for enc in ("utf-8", "euc-kr"):
+        try:
+            # final=False: a multi-byte character cut at the prefix boundary is not an error
+            codecs.getincrementaldecoder(enc)().decode(prefix, final=False)
+        except UnicodeDecodeError:
+            continue
+        if enc == "utf-8" and prefix.isascii():
+            continue  # ASCII only: keep the broker default (EUC-KR family)
+        return enc
+    return "cp949"
+
+
+class HashingReader(io.RawIOBase):
+    """
+    Binary reader that updates a sha256 with every byte handed to the parser,
+    so parsing a file and hashing it for the manifest share a single read.
+    """
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha = hashlib.sha256()
+        self._head = b""
+
+    def readable(self):
+        return True
+
+    def peek_prefix(self, size):
+        """ Read (and hash) the first size bytes; they are replayed to the parser first """
+        self._head = self.raw.read(size)
+        self.sha.update(self._head)
+        return self._head
+
+    def readinto(self, b):
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n], self._head = self._head[:n], self._head[n:]
+            return n
+        data = self.raw.read(len(b))
+        self.sha.update(data)
+        b[:len(data)] = data
+        return len(data)
+
+    def hexdigest(self):
+        # A parser may stop before EOF (trailing lines); hash the rest so the digest covers the file
+        for chunk in iter(lambda: self.raw.read(1 << 20), b""):
+            self.sha.update(chunk)
+        return self.sha.hexdigest()
+
+
+class IngestManifest:
+    """
+    Persisted record of ingested source files: path -> size, mtime, sha256.
+    A file whose size and mtime match is skipped without reading it. If only the
+    mtime changed (re-export of identical content), the hash decides.
+    The detected text encoding is kept per content hash so a re-read skips sniffing.
+    Several processes (scan BatchLoader, export watcher) share one manifest: save() merges
+    this process's changes into the current file under a file lock instead of overwriting it.
+    """
+    def __init__(self, path="ingest_manifest.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._changed = {}  # key -> entry, or None when forgotten (not yet saved)
+        self.entries = self._read()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[경고] ingest manifest 로드 실패 (전체 재적재): {e}")
+            return {}
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def check(self, path):
+        """
+        Returns (unchanged, digest). digest is None when the file must be parsed anyway
+        (new file or different size): the caller hashes it while parsing instead of reading it twice.
+        """
+        st = os.stat(path)
+        entry = self.entries.get(self._key(path))
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            return True, entry["sha256"]
+        if not entry or entry["size"] != st.st_size:
+            return False, None
+        digest = file_sha256(path)
+        if entry["sha256"] == digest:
+            # Same content, new mtime: remember the mtime so the next check is stat-only
+            with self._lock:
+                entry["mtime"] = st.st_mtime
+                self._changed[self._key(path)] = entry
+            return True, digest
+        return False, digest
+
+    def encoding_for(self, digest):
+        """ Encoding recorded for this content hash, or None """
+        if not digest:
+            return None
+        with self._lock:
+            return next((e.get("encoding") for e in self.entries.values()
+                         if e.get("sha256") == digest and e.get("encoding")), None)
+
+    def mark(self, path, digest=None, encoding=None):
+        """ Record a successfully ingested file """
+        st = os.stat(path)
+        key = self._key(path)
+        with self._lock:
+            self.entries[key] = self._changed[key] = {
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "sha256": digest or file_sha256(path),
+                "encoding": encoding,
+                "ingested_at": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def forget(self, path):
+        key = self._key(path)
+        with self._lock:
+            self.entries.pop(key, None)
+            self._changed[key] = None
+
+    def save(self):
+        """ Write this process's changes over the current file (other processes' entries are kept) """
+        with self._lock, file_lock(self.path):
+            merged = self._read()
+            for key, entry in self._changed.items():
+                if entry is None:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = entry
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(merged, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.entries = merged
+            self._changed = {}
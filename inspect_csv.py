@@ -1,6 +1,6 @@
 
-import pandas as pd
 import os
+from csv_cache import load_csv
 
 files = [
     r"C:\Users\yjham\Desktop\경제 study\잔고_국내260218.csv",
@@ -15,17 +15,13 @@ def inspect(path):
         print("File not found.")
         return
 
-    encodings = ['utf-8', 'cp949', 'utf-8-sig', 'euc-kr']
-    for enc in encodings:
-        try:
-            df = pd.read_csv(path, encoding=enc)
-            print(f"Success with {enc}")
-            print(df.head(2).to_string())
-            print("Columns:", df.columns.tolist())
-            return
-        except Exception as e:
-            continue
-    print("Failed to read with all attempted encodings.")
+    # Encoding is sniffed once per file; unchanged files come from the parse cache
+    try:
+        df = load_csv(path, header=0)
+        print(df.head(2).to_string())
+        print("Columns:", df.columns.tolist())
+    except Exception as e:
+        print(f"Failed to read: {e}")
 
 if __name__ == "__main__":
     for f in files:
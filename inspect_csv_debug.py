@@ -1,6 +1,6 @@
 
-import pandas as pd
 import os
+from csv_cache import load_csv
 
 files = [
     r"C:\Users\yjham\Desktop\경제 study\잔고_미국 260218.csv",
@@ -22,7 +22,7 @@ def inspect(path):
         
         # Try pandas with skipping rows if needed
         # Assuming header might be on line 0 or 1
-        df = pd.read_csv(path, encoding='cp949')
+        df = load_csv(path, header=0)
         print("Columns (Header=0):", df.columns.tolist())
     except Exception as e:
         print(f"Error: {e}")
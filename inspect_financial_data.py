@@ -1,7 +1,7 @@
 import os
 import glob
-import pandas as pd
 import io
+from csv_cache import load_csv
 
 def main():
     with open("inspection_result.txt", "w", encoding="utf-8") as outfile:
@@ -52,7 +52,7 @@ def main():
                     # Try parsing with pandas to see columns
                     try:
                         # Skip rows if needed - adjust based on raw output
-                        df = pd.read_csv(fname, encoding=enc, nrows=2)
+                        df = load_csv(fname, header=0)
                         log("\nPandas Columns:")
                         log(str(df.columns.tolist()))
                     except Exception as e:
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+
+from json_store import file_lock
+
+
+class IntelJournal:
+    """
+    [알파 HQ] 인텔리전스 로그 JSONL 저널 (DB 미연결 시 폴백 저장소)
+    한 건 = 한 줄 추가만 하므로 기록 비용은 메시지 크기에 비례한다. (watchlist.json 전체 재기록 제거)
+    파일이 max_bytes를 넘으면 기존 파일은 .1 로 넘기고(이전 .1은 폐기) 최근 항목만 남긴 새 파일로 압축한다.
+    압축 후 크기는 max_bytes // 2 이하(최대 keep건)이므로 항목이 커도 압축은 절반 분량이 쌓일 때마다 한 번이다.
+    최근 조회는 파일 끝에서부터 필요한 줄 수만큼만 읽는다.
+    """
+    def __init__(self, path="intel_journal.jsonl", max_bytes=1024 * 1024, keep=1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        self.extend([entry])
+
+    def extend(self, entries):
+        """ 여러 건을 한 번에 추가 (프로세스 간 파일 잠금 안에서) """
+        if not entries:
+            return
+        payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        with self._lock, file_lock(self.path):
+            with open(self.path, "ab") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.getsize(self.path) > self.max_bytes:
+                self._compact()
+
+    def _compact(self):
+        """ 현재 파일 -> .1 (백업 1세대), 최근 항목(max_bytes // 2 이하, 최대 keep건)만 새 파일로 """
+        recent = self._tail_lines(self.keep)
+        budget = self.max_bytes // 2
+        size, start = 0, len(recent)
+        while start > 0 and size + len(recent[start - 1]) + 1 <= budget:
+            start -= 1
+            size += len(recent[start]) + 1
+        recent = recent[start:]
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.writelines(line + b"\n" for line in recent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path, self.path + ".1")
+        os.replace(tmp, self.path)
+        print(f"[참고] 인텔 저널 압축: 최근 {len(recent)}건 유지 ({self.path})")
+
+    def _tail_lines(self, n, block=8192):
+        """ 파일 끝에서부터 블록 단위로 읽어 마지막 n줄(bytes, 오래된 순) """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b""
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = [line for line in data.split(b"\n") if line.strip()]
+        if pos > 0:
+            lines = lines[1:]  # 블록 경계에서 잘린 첫 줄
+        return lines[-n:] if n else []
+
+    def tail(self, n=10):
+        """ 최근 n건 (오래된 순). 깨진 줄(기록 도중 종료 등)은 건너뛴다. """
+        out = []
+        for line in self._tail_lines(n):
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue
+        return out
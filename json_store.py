@@ -0,0 +1,151 @@
+import atexit
+import copy
+import json
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(path):
+    """ 프로세스 간 advisory 잠금 (path + ".lock" 파일, Windows: msvcrt / 그 외: fcntl) """
+    with open(path + ".lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            # LK_LOCK: 잠금을 얻을 때까지 1초 간격으로 최대 10회 재시도
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class JsonStore:
+    """
+    [알파 HQ] 지연 기록(write-behind) JSON 저장소
+    변경은 메모리 문서에 바로 적용하고 flush_interval 초 뒤(또는 종료 시) 한 번에 파일로 쓴다.
+    - 기록: 임시 파일 + os.replace (원자적 교체) 를 advisory 파일 잠금 안에서 수행
+    - 다른 프로세스(텔레그램 봇 / 키움)가 그 사이 파일을 바꿨으면 다시 읽고 아직 쓰지 않은 변경을 재적용
+    - key를 준 변경은 같은 key의 이전 미기록 변경을 대체 (시세 틱 폭주 -> 마지막 값 1건)
+    """
+    def __init__(self, path, default=None, flush_interval=2.0, indent=None):
+        self.path = path
+        self.default = default or {}
+        self.flush_interval = flush_interval
+        self.indent = indent
+        self._lock = threading.RLock()
+        self._pending = []  # [(key, fn)] 아직 파일에 쓰지 않은 변경 (적용 순서대로)
+        self._timer = None
+        self._sig = None
+        self.loads = 0  # 디스크에서 문서를 (다시) 읽은 횟수: 값이 바뀌면 다른 프로세스의 변경이 반영된 것
+        self.data = self._read_disk()
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_disk(self):
+        sig = self._signature()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except ValueError as e:
+            print(f"[경고] {self.path} 손상 (기본값으로 시작): {e}")
+            data = {}
+        for k, v in self.default.items():
+            data.setdefault(k, copy.deepcopy(v))
+        self._sig = sig
+        self.loads += 1
+        return data
+
+    def _replay(self):
+        for _, fn in self._pending:
+            try:
+                fn(self.data)
+            except Exception:
+                traceback.print_exc()
+
+    def refresh(self):
+        """ 다른 프로세스가 파일을 바꿨으면 다시 읽고 미기록 변경을 재적용 (파일 stat 1회) """
+        with self._lock:
+            if self._signature() != self._sig:
+                self.data = self._read_disk()
+                self._replay()
+            return self.data
+
+    def mutate(self, fn, key=None):
+        """ fn(data)로 메모리 문서를 바로 변경하고 기록은 예약 """
+        with self._lock:
+            fn(self.data)
+            if key is not None:
+                self._pending = [p for p in self._pending if p[0] != key]
+            self._pending.append((key, fn))
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_later)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_later(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[경고] {self.path} 기록 실패 (재시도 예정): {e}")
+            with self._lock:
+                if self._timer is None and self._pending:
+                    self._timer = threading.Timer(self.flush_interval, self._flush_later)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def flush(self, force=False):
+        """ 미기록 변경을 파일에 반영 (force=True면 변경이 없어도 기록) -> 기록 여부 """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending and not force:
+                return False
+            with file_lock(self.path):
+                # 다른 프로세스의 기록 위에 이 프로세스의 변경을 다시 얹는다 (서로 덮어쓰기 방지)
+                if self._signature() != self._sig:
+                    self.data = self._read_disk()
+                    self._replay()
+                self._write_atomic()
+                self._sig = self._signature()
+            self._pending = []
+            self.writes += 1
+            return True
+
+    def _write_atomic(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=self.indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(5):
+            try:
+                os.replace(tmp, self.path)
+                return
+            except PermissionError:
+                # Windows: 다른 프로세스가 파일을 읽는 중이면 교체가 잠시 거부됨
+                if attempt == 4:
+                    os.remove(tmp)
+                    raise
+                time.sleep(0.05 * (attempt + 1))
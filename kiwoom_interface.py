@@ -119,25 +119,24 @@ class KiwoomInterface(QAxWidget):
             # [DB 업데이트] 실시간 시세를 DB에 기록
             self.manager.update_stock_price(name, price)
 
-            watchlist = self.manager.get_watchlist()
-            for stock in watchlist:
-                if stock["name"] in name:
-                    # [알림 로직] 목표가 도달 체크 (목표가가 설정된 경우에만)
-                    target_price = stock["target_price"]
-                    current_price = price
-                    stock_name = name
-
-                    if target_price > 0:
-                        # 현재가는 음수일 수 있음 (전일대비 하락 시 - 기호)
-                        abs_price = abs(current_price)
-
-                        # 근접 알림 (예: 1% 범위 내) 또는 도달 알림
-                        if abs_price >= target_price:
-                            msg = f"🚨 **[목표가 도달 알림]**\n종목: {stock_name}\n현재가: {abs_price:,}원\n목표가: {target_price:,}원\n\n[김대리] 사격 명령 대기 중입니다!"
-                            self.notifier.send_message(msg)
-                            # 중복 알림 방지를 위해 목표가 초기화 또는 로직 필요 (여기서는 일단 전송)
-                            self.manager.log_alert(name, price)
-                            self.manager.remove_from_watchlist(stock["name"])
+            # 감시 리스트 메모리 스냅샷 조회 (TR 응답마다 JSON/DB를 읽지 않음)
+            for stock in self.manager.match_watchlist(name):
+                # [알림 로직] 목표가 도달 체크 (목표가가 설정된 경우에만)
+                target_price = stock["target_price"]
+                current_price = price
+                stock_name = name
+
+                if target_price > 0:
+                    # 현재가는 음수일 수 있음 (전일대비 하락 시 - 기호)
+                    abs_price = abs(current_price)
+
+                    # 근접 알림 (예: 1% 범위 내) 또는 도달 알림
+                    if abs_price >= target_price:
+                        msg = f"🚨 **[목표가 도달 알림]**\n종목: {stock_name}\n현재가: {abs_price:,}원\n목표가: {target_price:,}원\n\n[김대리] 사격 명령 대기 중입니다!"
+                        self.notifier.send_message(msg)
+                        # 중복 알림 방지를 위해 목표가 초기화 또는 로직 필요 (여기서는 일단 전송)
+                        self.manager.log_alert(name, price)
+                        self.manager.remove_from_watchlist(stock["name"])
 
     def _receive_real_data(self, code, real_type, real_data):
         if real_type == "주식체결":
@@ -0,0 +1,29 @@
+import importlib
+
+
+class LazyModule:
+    """
+    [알파 HQ] 지연 import 대리 객체
+    pd = lazy_module("pandas") 처럼 모듈 상단에 선언해 두면 첫 속성 접근(pd.DataFrame 등) 시점에
+    실제 모듈을 import 한다. 엔트리 포인트 import 시간을 줄이기 위한 용도 (test_import_budget.py)
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            # import_module 자체가 import 락을 잡으므로 여러 스레드에서 동시에 불러도 안전
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name):
+    return LazyModule(name)
@@ -1,19 +1,48 @@
-import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta
 import os
 import requests
-from bs4 import BeautifulSoup
 import json
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from data_loader import BatchLoader
+import threading
+from db_pool import get_pool
+from lazy_import import lazy_module
+from naver_quotes import NaverQuoteClient
+from quote_cache import QuoteCache
+from stage_executor import StageExecutor
+from report_delivery import ReportDelivery
+import run_trace
+from run_trace import RunTrace
+
+# [NEW] 무거운 의존성(pandas, psycopg2, yfinance 계열 모듈)은 첫 사용 시점에 로드
+pd = lazy_module("pandas")
+pg_extras = lazy_module("psycopg2.extras")
+price_history = lazy_module("price_history")
 
 class MarketScanner:
     """
     알파 HQ 참모진 페르소나 기반 통합 시장 분석 + 유튜브 + 매크로/특징주(Section A/B) 시스템
     """
-    def __init__(self, tickers=None):
+    # 상장 목록 파일이 없을 때 등록하는 기본 샘플 및 지휘관 관심주
+    DEFAULT_MASTER_STOCKS = [
+        {'ticker': '005930.KS', 'name': '삼성전자', 'market': 'KOSPI'},
+        {'ticker': '000660.KS', 'name': 'SK하이닉스', 'market': 'KOSPI'},
+        {'ticker': '042700.KS', 'name': '한미반도체', 'market': 'KOSPI'},
+        {'ticker': '066570.KS', 'name': 'LG전자', 'market': 'KOSPI'},
+        {'ticker': '204270.KQ', 'name': 'JNTC', 'market': 'KOSDAQ'},
+        {'ticker': '082270.KQ', 'name': '젬벡스', 'market': 'KOSDAQ'},
+        {'ticker': '058470.KS', 'name': '강원랜드', 'market': 'KOSPI'},
+        {'ticker': '036830.KS', 'name': '솔브레인홀딩스', 'market': 'KOSPI'},
+        {'ticker': '403870.KS', 'name': 'HPSP', 'market': 'KOSPI'},
+        {'ticker': '095340.KS', 'name': 'ISC', 'market': 'KOSPI'},
+        {'ticker': '067310.KQ', 'name': '하나마이크론', 'market': 'KOSDAQ'},
+        {'ticker': 'NVDA', 'name': 'NVIDIA', 'market': 'NASDAQ'},
+        {'ticker': 'AAPL', 'name': 'Apple', 'market': 'NASDAQ'},
+        {'ticker': 'TSM', 'name': 'TSMC', 'market': 'NYSE'},
+        {'ticker': 'MU', 'name': 'Micron', 'market': 'NASDAQ'},
+        {'ticker': 'ASML', 'name': 'ASML', 'market': 'NASDAQ'},
+        {'ticker': 'VRT', 'name': 'Vertiv', 'market': 'NYSE'},
+    ]
+
+    def __init__(self, tickers=None, pool=None):
         self._load_config()
         if tickers is None:
             self.tickers = [
@@ -36,31 +65,102 @@ class MarketScanner:
         self.slack_token = self.config.get("slack", {}).get("token")
         self.slack_channel_daily = self.config.get("slack", {}).get("channel_daily")
         self.db_config = self.config.get("db", {}).get("url")
+        # [NEW] 프로세스 공용 커넥션 풀 (SentinelManager/BatchLoader와 공유)
+        self.pool = pool or get_pool(self.db_config)
 
         # [NEW] 유동적 참모진 설정 (config.json 로드)
         self.staff = self.config.get("staff", {})
         self.notebook_ids = {k: v.get("notebook") for k, v in self.staff.items()}
+
+        # [NEW] 스캔 스테이지 동시 실행 수 (네트워크 대기 구간 중첩, config.json "scanner" 설정)
+        scan_cfg = self.config.get("scanner", {})
+        self.max_workers = scan_cfg.get("max_workers", 4)
+
+        # [NEW] 한국 시세 병렬 수집기 (keep-alive 세션 공유)
+        self.naver = NaverQuoteClient(
+            max_workers=scan_cfg.get("naver_workers", 8),
+            per_host=scan_cfg.get("naver_per_host", 4),
+            timeout=scan_cfg.get("naver_timeout", 5),
+            deadline=scan_cfg.get("naver_deadline", 8)
+        )
+        # [NEW] 스캔 1회 동안 공유하는 시세 캐시 (모든 시세 조회는 이 캐시를 경유)
+        self.quote_cache = QuoteCache(
+            ttl=scan_cfg.get("quote_cache_ttl", 300),
+            maxsize=scan_cfg.get("quote_cache_size", 1024)
+        )
+        # [NEW] 리포트 전송 채널별 제한시간/재시도 (config.json "delivery" 설정, 채널별 timeout 덮어쓰기 가능)
+        self.delivery_cfg = self.config.get("delivery", {})
             
         self.report_dir = 'daily_reports'
         if not os.path.exists(self.report_dir):
             os.makedirs(self.report_dir)
 
-        # 센티널 매니저 연동
-        from sentinel_manager import SentinelManager
-        self.manager = SentinelManager()
-
-        # 노션 클라이언트 연동 (3-Page 방식)
-        from notion_client import NotionClient
-        notion_cfg = self.config.get("notion", {})
-        self.notion = NotionClient(
-            token=notion_cfg.get("token"),
-            page_summary=notion_cfg.get("page_summary"),
-            page_kr=notion_cfg.get("page_kr"),
-            page_us=notion_cfg.get("page_us"),
-            db_kr=notion_cfg.get("db_kr"),
-            db_us=notion_cfg.get("db_us")
-        )
-        self.notion.page_trading_alliance = notion_cfg.get("page_alliance", notion_cfg.get("page_summary"))
+        # [NEW] 센티널 매니저/노션 클라이언트/시세 이력/스크리너는 첫 사용 시점에 생성 (아래 property)
+        self._components = {}
+        self._components_lock = threading.RLock()
+
+    def _component(self, name, factory):
+        """ [NEW] 지연 생성 구성요소 (스테이지 스레드에서 동시에 접근해도 1회만 생성) """
+        with self._components_lock:
+            if name not in self._components:
+                self._components[name] = factory()
+            return self._components[name]
+
+    @property
+    def manager(self):
+        """ 센티널 매니저 연동 """
+        def build():
+            from sentinel_manager import SentinelManager
+            return SentinelManager(pool=self.pool)
+        return self._component("manager", build)
+
+    @property
+    def notion(self):
+        """ 노션 클라이언트 연동 (3-Page 방식) """
+        def build():
+            from notion_client import NotionClient
+            notion_cfg = self.config.get("notion", {})
+            client = NotionClient(
+                token=notion_cfg.get("token"),
+                page_summary=notion_cfg.get("page_summary"),
+                page_kr=notion_cfg.get("page_kr"),
+                page_us=notion_cfg.get("page_us"),
+                db_kr=notion_cfg.get("db_kr"),
+                db_us=notion_cfg.get("db_us")
+            )
+            client.page_trading_alliance = notion_cfg.get("page_alliance", notion_cfg.get("page_summary"))
+            return client
+        return self._component("notion", build)
+
+    @property
+    def history(self):
+        """ 로컬 OHLCV 이력 저장소 (빠진 봉만 증분 수집) """
+        def build():
+            from price_history import PriceHistoryStore
+            return PriceHistoryStore(root=self.config.get("paths", {}).get("price_history", "price_history"))
+        return self._component("history", build)
+
+    @property
+    def planner(self):
+        """ yfinance 다운로드 계획기 (로컬 이력 저장소 경유) """
+        def build():
+            from download_planner import DownloadPlanner
+            return DownloadPlanner(period="5d", store=self.history)
+        return self._component("planner", build)
+
+    @property
+    def screener(self):
+        """ 특징주 스크리너 (로컬 거래량 이력 + market_trends 수급, config.json "screener" 설정) """
+        def build():
+            from stock_screener import screener_from_config
+            return screener_from_config(self.config, self.history, self.pool)
+        return self._component("screener", build)
+
+    def preload(self):
+        """ [NEW] 상주 워커용: 지연 로드 대상을 미리 불러 첫 실행 지연을 없앤다 """
+        import pandas, yfinance, bs4, data_loader  # noqa: F401
+        for name in ("manager", "notion", "history", "planner", "screener"):
+            getattr(self, name)
 
     def _load_config(self):
         try:
@@ -71,41 +171,22 @@ class MarketScanner:
             self.config = {}
 
     def update_master_stocks(self):
-        """ [NEW] 주 1회 전체 종목 마스터 업데이트용 (기본 샘플 및 지휘관 관심주) """
+        """
+        [NEW] 주 1회 전체 종목 마스터 업데이트
+        config.json paths.master_listing 의 KRX/US 상장 목록을 COPY + 단일 병합으로 적재하고,
+        목록 파일이 없으면 기본 샘플 및 지휘관 관심주만 등록한다.
+        """
+        from master_loader import MasterListingLoader, listing_paths
         print("[알파 HQ] 마스터 데이터 동기화 시작...")
-        master_list = [
-            {'ticker': '005930.KS', 'name': '삼성전자', 'market': 'KOSPI'},
-            {'ticker': '000660.KS', 'name': 'SK하이닉스', 'market': 'KOSPI'},
-            {'ticker': '042700.KS', 'name': '한미반도체', 'market': 'KOSPI'},
-            {'ticker': '066570.KS', 'name': 'LG전자', 'market': 'KOSPI'},
-            {'ticker': '204270.KQ', 'name': 'JNTC', 'market': 'KOSDAQ'},
-            {'ticker': '082270.KQ', 'name': '젬벡스', 'market': 'KOSDAQ'},
-            {'ticker': '058470.KS', 'name': '강원랜드', 'market': 'KOSPI'},
-            {'ticker': '036830.KS', 'name': '솔브레인홀딩스', 'market': 'KOSPI'},
-            {'ticker': '403870.KS', 'name': 'HPSP', 'market': 'KOSPI'},
-            {'ticker': '095340.KS', 'name': 'ISC', 'market': 'KOSPI'},
-            {'ticker': '067310.KQ', 'name': '하나마이크론', 'market': 'KOSDAQ'},
-            {'ticker': 'NVDA', 'name': 'NVIDIA', 'market': 'NASDAQ'},
-            {'ticker': 'AAPL', 'name': 'Apple', 'market': 'NASDAQ'},
-            {'ticker': 'TSM', 'name': 'TSMC', 'market': 'NYSE'},
-            {'ticker': 'MU', 'name': 'Micron', 'market': 'NASDAQ'},
-            {'ticker': 'ASML', 'name': 'ASML', 'market': 'NASDAQ'},
-            {'ticker': 'VRT', 'name': 'Vertiv', 'market': 'NYSE'},
-        ]
-        
+        loader = MasterListingLoader(self.pool)
+        paths = listing_paths(self.config)
         try:
-            conn = psycopg2.connect(self.db_config)
-            cur = conn.cursor()
-            for stock in master_list:
-                cur.execute("""
-                    INSERT INTO master_stocks (ticker, name, market_type)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (ticker) DO UPDATE SET name = EXCLUDED.name, market_type = EXCLUDED.market_type;
-                """, (stock['ticker'], stock['name'], stock['market']))
-            conn.commit()
-            cur.close()
-            conn.close()
-            print(f"[성공] 총 {len(master_list)}개 마스터 종목 동기화 완료")
+            if paths:
+                count = loader.load_files(paths)
+            else:
+                print("[참고] 상장 목록 파일이 없어 기본 종목만 동기화합니다. (config.json paths.master_listing)")
+                count = loader.load([(s['ticker'], s['name'], s['market']) for s in self.DEFAULT_MASTER_STOCKS])
+            print(f"[성공] 총 {count}개 마스터 종목 동기화 완료")
         except Exception as e:
             print(f"[경고] 마스터 동기화 실패: {e}")
 
@@ -126,22 +207,12 @@ class MarketScanner:
 
     def fetch_global_macro_data(self):
         try:
-            data = yf.download(list(self.macro_tickers.keys()), period="5d")['Close']
-            res = []
-            for ticker, name in self.macro_tickers.items():
-                series = data[ticker].dropna()
-                if series.empty:
-                    res.append(f"- {name}: N/A (데이터 없음)")
-                    continue
-                
-                val = series.iloc[-1]
-                prev = series.iloc[-2] if len(series) >= 2 else val
-                
-                change = 0
-                if prev != 0:
-                    change = round((val - prev) / prev * 100, 2)
-                
-                res.append(f"- {name}: {val:,.2f} ({change}%)")
+            summary = price_history.latest_prev_change(self.fetch_yf_closes(list(self.macro_tickers.keys())))
+            res = [
+                f"- {name}: {summary.at[ticker, 'latest']:,.2f} ({summary.at[ticker, 'change']}%)"
+                if pd.notna(summary.at[ticker, 'latest']) else f"- {name}: N/A (데이터 없음)"
+                for ticker, name in self.macro_tickers.items()
+            ]
             return "\n".join(res)
         except Exception as e:
             print(f"매크로 데이터 오류: {e}")
@@ -150,125 +221,152 @@ class MarketScanner:
     def fetch_featured_stocks_dynamic(self):
         """
         [Section B] 거래량 200% 폭증 및 외인/기관 매집 종목 발굴
+        로컬 시세 이력만 사용 (유니버스 이력은 장 마감 후 별도 작업: python stock_screener.py refresh)
         """
         # 박차장(Echo 역할)의 특징주 탐색
         echo_name = self.staff.get('PARK', {}).get('name', '박차장')
         print(f"[{datetime.now()}] [{echo_name}] 전 섹터 대상 거래량 200% 폭증 및 수급 특이종목 탐색 중...")
-        featured = [
-            {
-                "name": "한미반도체",
-                "reason": "기관/외국인 쌍끌이 매수세 포착. 전일 대비 거래량 210% 급증.",
-                "comment": "지휘관님, 이 종목은 추가 검토가 필요해 보입니다."
-            },
-            {
-                "name": "SK하이닉스",
-                "reason": "특이 공시(HBM4 조기 양산 파트너십) 발생으로 장중 수급 집중.",
+        try:
+            ranked = self.screener.run()
+        except Exception as e:
+            print(f"[경고] 특징주 스크리닝 실패: {e}")
+            return []
+
+        featured = []
+        for ticker, row in ranked.iterrows():
+            featured.append({
+                "name": row['name'] if pd.notna(row['name']) else ticker,
+                "ticker": ticker,
+                "reason": ", ".join(row['reasons']),
+                "reasons": row['reasons'],
+                "score": row['score'],
                 "comment": "지휘관님, 이 종목은 추가 검토가 필요해 보입니다."
-            }
-        ]
+            })
+        print(f"[{datetime.now()}] [{echo_name}] 특징주 {len(featured)}종목 선별 완료")
         return featured
 
     def _get_naver_price(self, ticker_code):
         """ [NEW] 네이버 금융에서 한국 주식 현재가 + 등락률 수집 (Primary for KR) """
-        code = ticker_code.split('.')[0]
-        url = f"https://finance.naver.com/item/main.naver?code={code}"
+        return self.fetch_kr_quotes([ticker_code]).get(ticker_code)
+
+    def fetch_kr_quotes(self, tickers):
+        """ [NEW] 한국 종목 일괄 시세 조회 (캐시 경유) -> {ticker: {"price", "rate"} 또는 None} """
+        prefix = "naver:"
+        cached, missing = self.quote_cache.split([prefix + t for t in dict.fromkeys(tickers)])
+        quotes = {k[len(prefix):]: v for k, v in cached.items()}
+
+        fetched = self.naver.get_quotes([k[len(prefix):] for k in missing])
+        for ticker, quote in fetched.items():
+            self.quote_cache.put(prefix + ticker, quote)
+        quotes.update(fetched)
+        return quotes
+
+    def fetch_yf_closes(self, tickers):
+        """ [NEW] yfinance 종가 조회 (캐시 경유, 미스 종목은 다운로드 계획기에서 수령) -> 종가 DataFrame """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers: return pd.DataFrame()
+
+        prefix = "yf:"
+        cached, missing = self.quote_cache.split([prefix + t for t in tickers])
+        series = {k[len(prefix):]: v for k, v in cached.items()}
+
+        if missing:
+            missing_tickers = [k[len(prefix):] for k in missing]
+            close = self.planner.closes(missing_tickers)
+            for ticker in missing_tickers:
+                s = close[ticker]
+                self.quote_cache.put(prefix + ticker, s)
+                series[ticker] = s
+
+        return pd.DataFrame({t: series[t] for t in tickers})
+
+    def _load_portfolio_rows(self):
+        """ [NEW] DB 잔고 원본 행 조회 """
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=pg_extras.RealDictCursor)
+            cur.execute("SELECT ticker, name, quantity, avg_price, market_type FROM portfolio")
+            portfolio = cur.fetchall()
+            cur.close()
+        return portfolio
+
+    def plan_market_data(self):
+        """
+        [NEW] 스캔에 필요한 시세를 선수집
+        KR은 네이버 일괄 조회, 나머지(매크로/코어 US/포트폴리오 US/네이버 실패 KR)는 yfinance 1회 다운로드
+        반환값: 포트폴리오 원본 행 (fetch_portfolio_data 재사용)
+        """
         try:
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            res = requests.get(url, headers=headers, timeout=5)
-            soup = BeautifulSoup(res.text, 'html.parser')
-            
-            rate_info = soup.find('div', {'class': 'rate_info'})
-            if not rate_info: return None
-            
-            # 1. 현재가
-            today = rate_info.find('p', {'class': 'no_today'})
-            price = float(today.find('span', {'class': 'blind'}).text.replace(',', ''))
-            
-            # 2. 등락률 (패턴 분석: [어제보다, 2,600, 상승, 1.46, 퍼센트])
-            exday = rate_info.find('p', {'class': 'no_exday'})
-            blinds = [s.get_text().replace(',', '') for s in exday.find_all('span', {'class': 'blind'})]
-            
-            rate = 0.0
-            if len(blinds) >= 4:
-                try:
-                    # 보통 4번째(index 3) 또는 5번째에 등락률 위치
-                    # 숫자 + '.' + 숫자 형식 찾기
-                    for b in blinds:
-                        if '.' in b and b.replace('.', '').isdigit():
-                            rate = float(b)
-                            break
-                    if "하락" in "".join(blinds):
-                        rate = -rate
-                except:
-                    pass
-            
-            return {"price": price, "rate": rate}
+            portfolio = self._load_portfolio_rows()
         except Exception as e:
-            print(f"[경고] 네이버 금융 수집 실패 ({code}): {e}")
-            return None
+            print(f"[경고] 포트폴리오 조회 실패 (시세 계획에서 제외): {e}")
+            portfolio = []
+
+        tickers = list(self.tickers) + [p['ticker'] for p in portfolio]
+        kr_tickers = [t for t in tickers if '.KS' in t or '.KQ' in t]
+        kr_quotes = self.fetch_kr_quotes(kr_tickers)
+
+        self.planner.require("macro", list(self.macro_tickers.keys()))
+        self.planner.require("core", [t for t in self.tickers if not ('.KS' in t or '.KQ' in t)])
+        self.planner.require("portfolio", [p['ticker'] for p in portfolio if not ('.KS' in p['ticker'] or '.KQ' in p['ticker'])])
+        self.planner.require("kr_fallback", [p['ticker'] for p in portfolio if p['ticker'] in kr_tickers and not kr_quotes.get(p['ticker'])])
+        # 주간/월간 등락률 계산용 (KR도 로컬 이력 유지)
+        self.planner.require("history", kr_tickers)
+        try:
+            self.planner.execute()
+        except Exception as e:
+            print(f"[경고] yfinance 일괄 다운로드 실패: {e}")
+        return portfolio
 
-    def fetch_portfolio_data(self):
+    def fetch_portfolio_data(self, portfolio=None):
         """ [NEW] DB에서 잔고 데이터 및 상세 트렌드 수집 """
         try:
-            conn = psycopg2.connect(self.db_config)
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute("SELECT ticker, name, quantity, avg_price, market_type FROM portfolio")
-            portfolio = cur.fetchall()
-            cur.close()
-            conn.close()
+            if portfolio is None:
+                portfolio = self._load_portfolio_rows()
             
             if not portfolio: return []
             
-            tickers = [p['ticker'] for p in portfolio]
-            us_tickers = [t for t in tickers if not ('.KS' in t or '.KQ' in t)]
-            kr_tickers = [t for t in tickers if '.KS' in t or '.KQ' in t]
+            df = pd.DataFrame(portfolio)
+            is_kr = df['ticker'].str.contains(r'\.K[SQ]', regex=True)
+            avg_price = df['avg_price'].astype(float)
             
-            # US는 yfinance
-            us_data = yf.download(us_tickers, period="5d")['Close'] if us_tickers else pd.DataFrame()
+            # KR은 네이버 일괄 조회 우선
+            kr_quotes = {t: q for t, q in self.fetch_kr_quotes(df.loc[is_kr, 'ticker'].tolist()).items() if q}
+            naver_price = df['ticker'].map({t: q['price'] for t, q in kr_quotes.items()})
+            naver_rate = df['ticker'].map({t: q['rate'] for t, q in kr_quotes.items()})
             
-            res = []
-            for p in portfolio:
-                ticker = p['ticker']
-                latest_p = 0
-                daily_change = 0
-                
-                if ticker in kr_tickers:
-                    # KR은 네이버 우선
-                    info = self._get_naver_price(ticker)
-                    if info:
-                        latest_p = info['price']
-                        daily_change = info['rate']
-                    else:
-                        # 네이버 실패시 yfinance 시도
-                        try:
-                            yf_val = yf.download(ticker, period="1d")['Close'].iloc[-1]
-                            latest_p = yf_val if not pd.isna(yf_val) else float(p['avg_price'])
-                        except:
-                            latest_p = float(p['avg_price'])
-                else:
-                    # US는 yfinance
-                    try:
-                        latest_p = us_data[ticker].iloc[-1]
-                        if pd.isna(latest_p): latest_p = us_data[ticker].dropna().iloc[-1]
-                        prev_day_p = us_data[ticker].iloc[-2]
-                        daily_change = round((latest_p - prev_day_p) / prev_day_p * 100, 2) if prev_day_p != 0 else 0
-                    except:
-                        latest_p = float(p['avg_price'])
-
-                # 수익률
-                profit_pct = round((latest_p - float(p['avg_price'])) / float(p['avg_price']) * 100, 2) if float(p['avg_price']) != 0 else 0
-                
-                res.append({
-                    "ticker": ticker,
-                    "name": p['name'] if p['name'] else ticker,
+            # US + 네이버 실패 KR은 yfinance 종가 (실패 KR은 등락률 미산출)
+            yf_tickers = df.loc[~is_kr | naver_price.isna(), 'ticker'].tolist()
+            yf_summary = price_history.latest_prev_change(self.fetch_yf_closes(yf_tickers))
+            yf_latest = df['ticker'].map(yf_summary['latest'])
+            yf_change = df['ticker'].map(yf_summary['change']).where(~is_kr)
+            
+            latest_p = naver_price.fillna(yf_latest).fillna(avg_price)
+            daily_change = naver_rate.fillna(yf_change).fillna(0)
+            profit_pct = ((latest_p - avg_price) / avg_price.where(avg_price != 0) * 100).round(2).fillna(0)
+            
+            # 주간/월간 변동은 로컬 이력 기준 (네트워크 호출 없음)
+            hist_changes = self.history.changes(df['ticker'].tolist())
+            weekly = df['ticker'].map(hist_changes['weekly'])
+            monthly = df['ticker'].map(hist_changes['monthly'])
+            
+            res = [
+                {
+                    "ticker": p['ticker'],
+                    "name": p['name'] if p['name'] else p['ticker'],
                     "quantity": p['quantity'],
                     "avg_price": p['avg_price'],
-                    "current_price": latest_p,
-                    "daily_change": f"{daily_change}%",
-                    "weekly_change": "TBD", # 주간 변동은 별도 로직 필요하나 일단 TBD
-                    "profit_pct": f"{profit_pct}%",
+                    "current_price": price,
+                    "daily_change": f"{daily}%",
+                    "weekly_change": f"{week}%" if pd.notna(week) else "N/A",
+                    "monthly_change": f"{month}%" if pd.notna(month) else "N/A",
+                    "profit_pct": f"{profit}%",
                     "market": p['market_type']
-                })
+                }
+                for p, price, daily, week, month, profit in zip(
+                    portfolio, latest_p.tolist(), daily_change.tolist(),
+                    weekly.tolist(), monthly.tolist(), profit_pct.tolist()
+                )
+            ]
             return res
         except Exception as e:
             print(f"[경고] 포트폴리오 데이터 수집 실패: {e}")
@@ -277,12 +375,11 @@ class MarketScanner:
     def fetch_strategy_direction(self):
         """ [NEW] DB에서 최신 전략 방향성 수집 """
         try:
-            conn = psycopg2.connect(self.db_config)
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute("SELECT direction, risk_level, allocation_guide FROM strategy_focus ORDER BY created_at DESC LIMIT 1")
-            strategy = cur.fetchone()
-            cur.close()
-            conn.close()
+            with self.pool.connection() as conn:
+                cur = conn.cursor(cursor_factory=pg_extras.RealDictCursor)
+                cur.execute("SELECT direction, risk_level, allocation_guide FROM strategy_focus ORDER BY created_at DESC LIMIT 1")
+                strategy = cur.fetchone()
+                cur.close()
             return strategy
         except Exception as e:
             print(f"[경고] 전략 데이터 수집 실패: {e}")
@@ -291,23 +388,22 @@ class MarketScanner:
     def get_financial_summary(self):
         """ [NEW] 참모진 브리핑용 재무 상황 요약 """
         try:
-            conn = psycopg2.connect(self.db_config)
-            cur = conn.cursor(cursor_factory=RealDictCursor)
+            with self.pool.connection() as conn:
+                cur = conn.cursor(cursor_factory=pg_extras.RealDictCursor)
+                cur.execute("SELECT ticker, quantity, avg_price, market_type FROM portfolio")
+                ports = cur.fetchall()
+                cur.execute("SELECT trade_date, type, ticker, quantity, price FROM transactions ORDER BY trade_date DESC LIMIT 5")
+                trans = cur.fetchall()
+                cur.close()
             
             summary = []
-            cur.execute("SELECT ticker, quantity, avg_price, market_type FROM portfolio")
-            ports = cur.fetchall()
             summary.append(f"총 보유 종목 수: {len(ports)}개")
             
-            cur.execute("SELECT trade_date, type, ticker, quantity, price FROM transactions ORDER BY trade_date DESC LIMIT 5")
-            trans = cur.fetchall()
             if trans:
                 summary.append("최근 거래 내역:")
                 for t in trans:
                     summary.append(f"- {t['trade_date']} {t['type']} {t['ticker']} ({t['quantity']}주, {t['price']:,.0f})")
             
-            cur.close()
-            conn.close()
             return "\n".join(summary)
         except Exception as e:
             print(f"[경고] 재무 브리핑 준비 실패: {e}")
@@ -351,89 +447,62 @@ class MarketScanner:
         
         return {"season": season, "rationale": rationale}
 
-    def run_comprehensive_scan(self):
-        """
-        [Main Logic]
-        1. Sync Local Data
-        2. Global Macro
-        3. Feature Stocks
-        4. Portfolio & Strategy
-        5. Report
-        """
-        print(f"=== [{datetime.now()}] Comprehensive Market Scan Start ===")
-
-        # 0. Data Sync (Local Files)
+    def sync_local_data(self):
+        """ [NEW] 로컬 잔고/거래내역/수급 파일 DB 동기화 """
         try:
             print(">> Syncing Local Portfolio/Transaction Data...")
-            BatchLoader().run()
+            from data_loader import BatchLoader
+            BatchLoader(pool=self.pool).run()
         except Exception as e:
             print(f"[Warning] Data Sync Failed: {e}")
 
-        # 1. [Section A] 글로벌 매크로 분석
-        headlines, keywords = self.fetch_macro_headlines()
-        macro_data_text = self.fetch_global_macro_data()
-        
-        # 2. [Section B] 특징주 발굴
-        featured_stocks = self.fetch_featured_stocks_dynamic()
-        
-        # 3. [Core Focus] 기존 종목 분석
+    def build_core_prices(self):
+        """ [Core Focus] 코어 종목 시세 테이블 (plan_market_data 이후 호출 시 추가 네트워크 없음) """
         us_tickers = [t for t in self.tickers if not ('.KS' in t or '.KQ' in t)]
         kr_tickers = [t for t in self.tickers if '.KS' in t or '.KQ' in t]
         
-        # US는 yfinance
-        us_data = yf.download(us_tickers, period="5d")['Close'] if us_tickers else pd.DataFrame()
-        
-        latest_prices_dict = {}
         # 마스터 종목명 사전 확보
         ticker_name_map = {}
         try:
-            conn = psycopg2.connect(self.db_config)
-            cur = conn.cursor()
-            cur.execute("SELECT ticker, name FROM master_stocks")
-            ticker_name_map = {row[0]: row[1] for row in cur.fetchall()}
-            cur.close()
-            conn.close()
+            with self.pool.connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT ticker, name FROM master_stocks")
+                ticker_name_map = {row[0]: row[1] for row in cur.fetchall()}
+                cur.close()
         except:
             pass
 
-        # KR 처리
-        for ticker in kr_tickers:
-            name = ticker_name_map.get(ticker, ticker)
-            info = self._get_naver_price(ticker)
-            if info:
-                latest_prices_dict[ticker] = {'Name': name, 'Close': info['price'], 'Change(%)': info['rate']}
-            else:
-                latest_prices_dict[ticker] = {'Name': name, 'Close': 0, 'Change(%)': 0}
-                
-        # US 처리
-        for ticker in us_tickers:
-            name = ticker_name_map.get(ticker, ticker)
-            try:
-                val = us_data[ticker].iloc[-1]
-                if pd.isna(val): val = us_data[ticker].dropna().iloc[-1]
-                prev_val = us_data[ticker].iloc[-2]
-                if pd.isna(prev_val): prev_val = us_data[ticker].dropna().iloc[-2]
-                change = round((val - prev_val) / prev_val * 100, 2) if prev_val != 0 else 0
-                latest_prices_dict[ticker] = {'Name': name, 'Close': val, 'Change(%)': change}
-            except:
-                latest_prices_dict[ticker] = {'Name': name, 'Close': 0, 'Change(%)': 0}
-            
-        latest_prices = pd.DataFrame.from_dict(latest_prices_dict, orient='index')
-        
-        # 4. [Section D] 텔레그램 인텔리전스 (세사모 등)
-        recent_intel = self.manager.get_recent_intel()
-        
-        # 4-1. [NEW] 포트폴리오 및 전략 데이터 수집
-        portfolio_data = self.fetch_portfolio_data()
-        strategy_data = self.fetch_strategy_direction()
-        financial_summary = self.get_financial_summary()
-        print(f">> Staff Briefing Context Prepared: {len(financial_summary)} chars")
-        financial_summary = self.get_financial_summary() # For Staff Context
+        # KR 처리 (네이버 일괄 조회, 실패 시 0)
+        kr_quotes = self.fetch_kr_quotes(kr_tickers)
+        kr_prices = pd.DataFrame({
+            'Close': [(kr_quotes.get(t) or {}).get('price', 0) for t in kr_tickers],
+            'Change(%)': [(kr_quotes.get(t) or {}).get('rate', 0) for t in kr_tickers]
+        }, index=kr_tickers)
+
+        # US 처리 (yfinance 종가 일괄 계산, 데이터 없으면 0)
+        us_summary = price_history.latest_prev_change(self.fetch_yf_closes(us_tickers))
+        us_prices = pd.DataFrame({
+            'Close': us_summary['latest'].fillna(0),
+            'Change(%)': us_summary['change']
+        }).reindex(us_tickers)
+
+        latest_prices = pd.concat([kr_prices, us_prices])
+        latest_prices.insert(0, 'Name', [ticker_name_map.get(t, t) for t in latest_prices.index])
+        # 주간/월간 변동 (로컬 이력 기준)
+        hist_changes = self.history.changes(list(latest_prices.index))
+        latest_prices['Week(%)'] = hist_changes['weekly'].reindex(latest_prices.index)
+        latest_prices['Month(%)'] = hist_changes['monthly'].reindex(latest_prices.index)
+        return latest_prices
+
+    def compose_report(self, headlines, macro, featured, prices, intel, portfolio, strategy, financial):
+        """ [NEW] 수집 결과로 슬랙용 텍스트 리포트 + 노션 전송용 데이터 조립 """
+        headlines, keywords = headlines
+        macro_data_text, featured_stocks, latest_prices, recent_intel = macro, featured, prices, intel
 
         # ... (Staff Context update logic would go here if passing to LLM) ...
         # Currently the LLM analysis logic is inside scan_kr_market() etc.
         # But we can print it for log.
-        print(f">> Staff Briefing Context Prepared: {len(financial_summary)} chars")
+        print(f">> Staff Briefing Context Prepared: {len(financial)} chars")
         
         # 5. 데이터 구조화 (참모진 동적 적용 및 노션용)
         cabin_info = self.staff.get('CABIN', {'name': '캐빈'})
@@ -446,10 +515,6 @@ class MarketScanner:
             park_info['name']: "특징주 수급 집중 포착. 기관/외국인 매집 패턴을 분석하여 스마트 머니의 방향 추적 중."
         }
 
-        market_table = [["Ticker", "Name", "Close", "Change(%)"]]
-        for ticker, row in latest_prices.iterrows():
-            market_table.append([ticker, row['Name'], f"{row['Close']:,.2f}", f"{row['Change(%)']}%"])
-
         reference_links = [
             {"name": "현승아카데미", "url": "https://www.youtube.com/@hs_academy"},
             {"name": "삼프로TV", "url": "https://www.youtube.com/@3protv"},
@@ -502,8 +567,9 @@ class MarketScanner:
         
         final_report_text = "\n".join(report)
         print(final_report_text)
+        print(f">> Quote Cache: {self.quote_cache.stats()} / yfinance downloads: {self.planner.downloads}")
         
-        # 7. 노션 3-Page 전송
+        # 7. 노션 3-Page 전송용 데이터
         # KR 종목과 US 종목 분리
         kr_table = [["종목명(Ticker)", "현재가", "등락률(%)"]]
         us_table = [["Name(Ticker)", "Close", "Change(%)"]]
@@ -515,49 +581,62 @@ class MarketScanner:
             else:
                 us_table.append(row_data)
 
-        active_models = sorted(list(set(s.get('model') for s in self.staff.values() if s.get('model'))))
         model_info = {
             'models': ', '.join(active_models),
             'pipeline': 'Hierarchical (Flash Scan -> Deep Analysis)',
             'efficiency': '~75% Saved (Context Caching & Summary First)'
         }
 
-        # (1) 통합 요약 → Summary 페이지
-        self.notion.send_summary_report({
+        return {
+            'text': final_report_text,
             'experts': experts_opinions,
             'keywords': keywords,
             'headlines': headlines,
             'macro_text': macro_data_text,
             'model_info': model_info,
-            'strategy': strategy_data
-        })
-
-        # (2) 한국 시장 → KR 페이지
-        if len(kr_table) > 1:
-            kr_portfolio = [p for p in portfolio_data if p['market'] in ['KOSPI', 'KOSDAQ']]
-            self.notion.send_kr_report({
-                'kr_table': kr_table,
-                'featured_stocks': featured_stocks,
-                'intel': recent_intel,
-                'keywords': keywords,
+            'strategy': strategy,
+            'kr_table': kr_table,
+            'us_table': us_table,
+            'featured_stocks': featured_stocks,
+            'intel': recent_intel,
+            'links': reference_links,
+            'portfolio': portfolio,
+            'prices': latest_prices
+        }
+
+    def send_notion_summary(self, report):
+        """ (1) 통합 요약 → Summary 페이지 """
+        return self.notion.send_summary_report({k: report[k] for k in ['experts', 'keywords', 'headlines', 'macro_text', 'model_info', 'strategy']})
+
+    def send_notion_kr(self, report):
+        """ (2) 한국 시장 → KR 페이지 """
+        if len(report['kr_table']) > 1:
+            kr_portfolio = [p for p in report['portfolio'] if p['market'] in ['KOSPI', 'KOSDAQ']]
+            return self.notion.send_kr_report({
+                'kr_table': report['kr_table'],
+                'featured_stocks': report['featured_stocks'],
+                'intel': report['intel'],
+                'keywords': report['keywords'],
                 'portfolio': kr_portfolio
             })
 
-        # (3) 미국 시장 → US 페이지
-        if len(us_table) > 1:
-            us_portfolio = [p for p in portfolio_data if p['market'] in ['NASDAQ', 'NYSE']]
-            self.notion.send_us_report({
-                'us_table': us_table,
-                'headlines': headlines,
-                'macro_text': macro_data_text,
-                'links': reference_links,
+    def send_notion_us(self, report):
+        """ (3) 미국 시장 → US 페이지 """
+        if len(report['us_table']) > 1:
+            us_portfolio = [p for p in report['portfolio'] if p['market'] in ['NASDAQ', 'NYSE']]
+            return self.notion.send_us_report({
+                'us_table': report['us_table'],
+                'headlines': report['headlines'],
+                'macro_text': report['macro_text'],
+                'links': report['links'],
                 'portfolio': us_portfolio
             })
 
-        # (4) 4th PJT 전략 연합 → Alliance 페이지 (Investment Season + Conviction Picks)
+    def send_notion_alliance(self, report):
+        """ (4) 4th PJT 전략 연합 → Alliance 페이지 (Investment Season + Conviction Picks) """
         try:
-            season_data = self.determine_investment_season(macro_data_text, latest_prices)
-            self.notion.send_alliance_report({
+            season_data = self.determine_investment_season(report['macro_text'], report['prices'])
+            sent = self.notion.send_alliance_report({
                 'season': season_data['season'],
                 'conviction_stocks': [
                     {'name': '삼성전자 (005930.KS)', 'weight': '20%', 'strategy': '78,000 부근 눌림목 매수'},
@@ -566,44 +645,115 @@ class MarketScanner:
                 ],
                 'rationale': season_data['rationale']
             })
-            print("[성공] 4th PJT 연합 전략 보고서 전송 완료")
+            if sent:
+                print("[성공] 4th PJT 연합 전략 보고서 전송 완료")
+            return sent
         except Exception as e:
             print(f"[경고] 연합 보고서 전송 실패: {e}")
+            return False
 
-        # 8. 기존 채널 알림 및 파일 저장
-        self.send_to_slack(final_report_text, self.slack_channel_daily)
-
+    def send_telegram_briefing(self, report):
+        """ 텔레그램 모닝 브리핑 (리포트 앞부분 요약) """
         try:
             from telegram_notifier import TelegramNotifier
             tel_config = self.config.get("telegram", {})
             telegram = TelegramNotifier(token=tel_config.get("token"), chat_id=tel_config.get("chat_id"))
-            telegram.send_message(f"🚨 **[알파 HQ 모닝 브리핑]**\n\n{final_report_text[:500]}...")
+            return telegram.send_message(f"🚨 **[알파 HQ 모닝 브리핑]**\n\n{report['text'][:500]}...")
         except Exception as e:
             print(f"텔레그램 발송 실패: {e}")
+            return False
 
-        if featured_stocks:
-            print(f"[{datetime.now()}] [{park_info['name']}] 특징주 {len(featured_stocks)}종목 센티널 감시 리스트에 추가 중...")
-            for stock in featured_stocks:
+    def deliver_report(self, report):
+        """
+        [NEW] Notion 4페이지 / Slack / Telegram 동시 전송 (채널별 제한시간 + 백오프 재시도)
+        반환값: {채널: {"status", "attempts", "elapsed_ms", "error"}}
+        """
+        cfg = self.delivery_cfg
+        timeouts = cfg.get("timeouts", {})
+        delivery = ReportDelivery(timeout=cfg.get("timeout", 30), retries=cfg.get("retries", 2),
+                                  backoff=cfg.get("backoff", 1.0))
+        # Notion은 블록 청크마다 최대 30초 요청이므로 제한시간을 길게 두고,
+        # 재시도는 NotionClient가 실패한 청크 단위로 수행 (페이지 전체 재전송 시 블록 중복)
+        notion_timeout = timeouts.get("notion", 90)
+        delivery.add("notion_summary", lambda: self.send_notion_summary(report), timeout=notion_timeout, retries=0)
+        delivery.add("notion_kr", lambda: self.send_notion_kr(report), timeout=notion_timeout, retries=0)
+        delivery.add("notion_us", lambda: self.send_notion_us(report), timeout=notion_timeout, retries=0)
+        delivery.add("notion_alliance", lambda: self.send_notion_alliance(report), timeout=notion_timeout, retries=0)
+        delivery.add("slack", lambda: self.send_to_slack(report['text'], self.slack_channel_daily),
+                     timeout=timeouts.get("slack"))
+        delivery.add("telegram", lambda: self.send_telegram_briefing(report), timeout=timeouts.get("telegram"))
+        return delivery.run()
+
+    def register_featured_watchlist(self, featured):
+        """ 특징주 센티널 감시 리스트 등록 """
+        if featured:
+            park_name = self.staff.get('PARK', {'name': '박차장'})['name']
+            print(f"[{datetime.now()}] [{park_name}] 특징주 {len(featured)}종목 센티널 감시 리스트에 추가 중...")
+            for stock in featured:
                 self.manager.add_to_watchlist(stock['name'], 0)
-        
+
+    def save_report_file(self, report):
         file_name = f"comprehensive_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         with open(os.path.join(self.report_dir, file_name), 'w', encoding='utf-8') as f:
-            f.write(final_report_text)
-        
-        return final_report_text
+            f.write(report['text'])
+
+    def run_comprehensive_scan(self):
+        """
+        [Main Logic] 스테이지 DAG 실행 (입력이 준비된 스테이지는 동시 실행)
+        1. Sync Local Data -> 시세 선수집(plan)
+        2. Global Macro / Feature Stocks / Intel / Strategy (서로 독립)
+        3. Core Prices & Portfolio (plan 이후)
+        4. Report -> 전송(Notion / Slack / Telegram 동시) / 파일 저장
+        """
+        print(f"=== [{datetime.now()}] Comprehensive Market Scan Start ===")
+        self.quote_cache.clear()
+        self.planner.reset()
+
+        dag = StageExecutor(max_workers=self.max_workers)
+        # 0. 로컬 데이터 동기화 + 시세 선수집 (네이버 일괄 + yfinance 1회)
+        dag.add("sync", self.sync_local_data)
+        dag.add("plan", lambda sync: self.plan_market_data(), deps=["sync"], default=[])
+        # 1~2. [Section A/B/D] 매크로, 특징주, 텔레그램 인텔리전스, 전략
+        dag.add("headlines", self.fetch_macro_headlines, default=([], []))
+        dag.add("macro", lambda plan: self.fetch_global_macro_data(), deps=["plan"], default="매크로 데이터 수집 실패")
+        dag.add("featured", lambda sync: self.fetch_featured_stocks_dynamic(), deps=["sync"], default=[])
+        dag.add("intel", lambda: self.manager.get_recent_intel(), default=[])
+        dag.add("strategy", self.fetch_strategy_direction)
+        # 3. [Core Focus] 코어 종목 + 포트폴리오 + 재무 요약
+        dag.add("prices", lambda plan: self.build_core_prices(), deps=["plan"],
+                default=pd.DataFrame(columns=['Name', 'Close', 'Change(%)']))
+        dag.add("portfolio", lambda plan: self.fetch_portfolio_data(plan), deps=["plan"], default=[])
+        dag.add("financial", lambda sync: self.get_financial_summary(), deps=["sync"], default="재무 정보 수집 실패")
+        # 4. 리포트 조립 및 전송
+        dag.add("report", self.compose_report,
+                deps=["headlines", "macro", "featured", "prices", "intel", "portfolio", "strategy", "financial"])
+        dag.add("delivery", self.deliver_report, deps=["report"], default={})
+        dag.add("watchlist", self.register_featured_watchlist, deps=["featured"])
+        dag.add("save", self.save_report_file, deps=["report"])
+
+        trace = RunTrace("scan", self.report_dir).start()
+        try:
+            results = dag.run()
+        finally:
+            trace.finish()
+        report = results.get("report")
+        return report['text'] if report else None
 
     def send_to_slack(self, text, channel_id):
         url = "https://slack.com/api/chat.postMessage"
         headers = {"Authorization": f"Bearer {self.slack_token}", "Content-Type": "application/json"}
         try:
             response = requests.post(url, headers=headers, json={"channel": channel_id, "text": text}, timeout=10)
+            run_trace.record("slack", len(response.content))
             res_data = response.json()
             if res_data.get("ok"):
                 print(f"[성공] 슬랙 메시지 전송 완료 (채널: {channel_id})")
-            else:
-                print(f"[실패] 슬랙 전송 오류: {res_data.get('error')}")
+                return True
+            print(f"[실패] 슬랙 전송 오류: {res_data.get('error')}")
+            return False
         except Exception as e:
             print(f"[오류] 슬랙 연동 중 문제 발생: {e}")
+            return False
 
 if __name__ == "__main__":
     scanner = MarketScanner()
@@ -0,0 +1,161 @@
+import csv
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+import run_trace
+from db_pool import copy_csv
+
+# 상장 목록 파일별 열 이름 후보 (KRX 전종목 기본정보 CSV, KIND 상장법인목록, NASDAQ Trader 목록)
+CODE_COLUMNS = ["단축코드", "종목코드", "Symbol", "ACT Symbol", "ticker", "Ticker", "Code"]
+NAME_COLUMNS = ["한글 종목약명", "종목명", "회사명", "한글 종목명", "Security Name", "name", "Name"]
+MARKET_COLUMNS = ["시장구분", "market", "Market", "Exchange", "Market Category"]
+
+KR_MARKETS = {"KOSPI": ("KOSPI", ".KS"), "유가증권": ("KOSPI", ".KS"), "유가": ("KOSPI", ".KS"),
+              "KOSDAQ": ("KOSDAQ", ".KQ"), "코스닥": ("KOSDAQ", ".KQ")}
+# NASDAQ Trader otherlisted.txt 의 Exchange 코드
+US_EXCHANGES = {"N": "NYSE", "A": "NYSE", "P": "NYSE", "Z": "NYSE", "V": "NYSE"}
+
+
+def _pick(header, candidates):
+    for c in candidates:
+        if c in header:
+            return c
+    return None
+
+
+def _read_text(path):
+    """ KRX 파일은 CP949, 그 외는 UTF-8(BOM 포함) """
+    with open(path, "rb") as f:
+        raw = f.read()
+    for enc in ("utf-8-sig", "cp949"):
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+def read_listing(path):
+    """
+    상장 목록 파일 -> [(ticker, name, market_type)]
+    - KR: 6자리 코드 + .KS/.KQ (KONEX 등 yfinance 미지원 시장은 제외)
+    - US: 심볼 그대로, market_type은 NASDAQ/NYSE (테스트 종목 제외)
+    """
+    text = _read_text(path)
+    first_line = text.split("\n", 1)[0]
+    delimiter = "|" if "|" in first_line else ("\t" if "\t" in first_line else ",")
+    reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
+    header = [h.strip() for h in (reader.fieldnames or [])]
+    reader.fieldnames = header
+
+    code_col, name_col = _pick(header, CODE_COLUMNS), _pick(header, NAME_COLUMNS)
+    market_col = _pick(header, MARKET_COLUMNS)
+    if not code_col or not name_col:
+        raise ValueError(f"종목코드/종목명 열을 찾을 수 없음: {os.path.basename(path)} {header[:8]}")
+    # nasdaqlisted.txt 는 Exchange 열이 없고 전부 NASDAQ
+    is_nasdaq_file = "Market Category" in header and "Exchange" not in header
+
+    records = []
+    for row in reader:
+        code = (row.get(code_col) or "").strip().strip("'")
+        name = (row.get(name_col) or "").strip()
+        if not code or not name or row.get("Test Issue") == "Y":
+            continue  # 빈 행 / "File Creation Time" 꼬리 행 / 테스트 종목
+        market = (row.get(market_col) or "").strip() if market_col else ""
+
+        kr = next((v for k, v in KR_MARKETS.items() if market.upper().startswith(k.upper())), None)
+        if kr:
+            market_type, suffix = kr
+            records.append((code.zfill(6) + suffix, name[:100], market_type))
+        elif code.isdigit():
+            continue  # KONEX 등 yfinance 미지원 국내 시장
+        else:
+            if is_nasdaq_file or market.upper().startswith("NASDAQ"):
+                market_type = "NASDAQ"
+            else:
+                market_type = US_EXCHANGES.get(market, market.upper() or "NYSE")
+            # yfinance 표기 (BRK.B -> BRK-B)
+            records.append((code.replace(".", "-")[:20], name[:100], market_type[:20]))
+    return records
+
+
+class MasterListingLoader:
+    """
+    [알파 HQ] 종목 마스터 대량 적재기
+    상장 목록을 임시 스테이징 테이블로 COPY 한 뒤 INSERT ... ON CONFLICT 한 번으로 master_stocks에 병합한다.
+    (행 단위 execute 대비 수천 종목 전체 갱신이 1초 미만)
+    """
+    def __init__(self, pool):
+        self.pool = pool
+
+    def load(self, records):
+        """ records: [(ticker, name, market_type)] -> 병합 대상 종목 수 """
+        if not records:
+            return 0
+        buf = copy_csv(records)
+        nbytes = len(buf.getvalue())
+
+        t0 = time.perf_counter()
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TEMP TABLE master_stage (
+                    ticker VARCHAR(20),
+                    name VARCHAR(100),
+                    market_type VARCHAR(20)
+                ) ON COMMIT DROP;
+            """)
+            cur.copy_expert("COPY master_stage (ticker, name, market_type) FROM STDIN WITH (FORMAT csv)", buf)
+            # ON CONFLICT는 한 문장에서 같은 행을 두 번 갱신할 수 없으므로 ticker당 1건만 병합 (파일 간 중복 대비)
+            cur.execute("""
+                INSERT INTO master_stocks (ticker, name, market_type)
+                SELECT DISTINCT ON (ticker) ticker, name, market_type FROM master_stage ORDER BY ticker
+                ON CONFLICT (ticker) DO UPDATE
+                SET name = EXCLUDED.name, market_type = EXCLUDED.market_type, last_updated = CURRENT_TIMESTAMP
+                WHERE (master_stocks.name, master_stocks.market_type)
+                      IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.market_type);
+            """)
+            changed = cur.rowcount
+            cur.close()
+        elapsed = time.perf_counter() - t0
+        run_trace.record("master_listing", nbytes)
+        print(f"[{datetime.now()}] [성공] 마스터 종목 {len(records):,}건 병합 (변경 {changed:,}건, "
+              f"{elapsed * 1000:,.0f} ms, {len(records) / max(elapsed, 1e-6):,.0f} rows/s)")
+        return len(records)
+
+    def load_files(self, paths):
+        """ 여러 상장 목록 파일을 읽어 한 번에 병합 """
+        records = []
+        for path in paths:
+            try:
+                rows = read_listing(path)
+                print(f">> 상장 목록 로드: {os.path.basename(path)} ({len(rows):,}종목)")
+                records.extend(rows)
+            except Exception as e:
+                print(f"[경고] 상장 목록 읽기 실패 ({path}): {e}")
+        return self.load(records)
+
+
+def listing_paths(config):
+    """ config.json paths.master_listing (파일 1개 또는 목록) 중 존재하는 파일 """
+    paths = config.get("paths", {}).get("master_listing", [])
+    if isinstance(paths, str):
+        paths = [paths]
+    return [p for p in paths if os.path.exists(p)]
+
+
+if __name__ == "__main__":
+    # 사용법: python master_loader.py [상장목록.csv ...]  (인자가 없으면 config.json paths.master_listing)
+    import json
+    from db_pool import get_pool
+
+    with open("config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    targets = sys.argv[1:] or listing_paths(config)
+    if not targets:
+        print("[경고] 상장 목록 파일 없음 (config.json paths.master_listing 설정 필요)")
+        sys.exit(1)
+    MasterListingLoader(get_pool(config["db"]["url"])).load_files(targets)
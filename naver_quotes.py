@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import run_trace
+
+
+class NaverQuoteClient:
+    """
+    [알파 HQ] 네이버 금융 한국 주식 시세 수집기
+    keep-alive 세션 1개를 공유하고, 호스트별 동시 요청 수와 요청당 데드라인을 제한한 상태로
+    여러 종목을 병렬 조회한다.
+    """
+    BASE_URL = "https://finance.naver.com/item/main.naver?code={code}"
+
+    def __init__(self, max_workers=8, per_host=4, timeout=5, deadline=8):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout      # 소켓 연결/읽기 타임아웃 (초)
+        self.deadline = deadline    # 요청 1건당 전체 허용 시간 (초)
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0'})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_workers, per_host))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        """ 호스트별 동시 요청 제한용 세마포어 """
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    @staticmethod
+    def parse_quote(html):
+        """ 종목 메인 페이지 HTML(str/bytes)에서 현재가 + 등락률 추출 """
+        from bs4 import BeautifulSoup  # 파싱 시점에 로드 (import 시간 절약)
+        soup = BeautifulSoup(html, 'html.parser')
+
+        rate_info = soup.find('div', {'class': 'rate_info'})
+        if not rate_info: return None
+
+        # 1. 현재가
+        today = rate_info.find('p', {'class': 'no_today'})
+        price = float(today.find('span', {'class': 'blind'}).text.replace(',', ''))
+
+        # 2. 등락률 (패턴 분석: [어제보다, 2,600, 상승, 1.46, 퍼센트])
+        exday = rate_info.find('p', {'class': 'no_exday'})
+        blinds = [s.get_text().replace(',', '') for s in exday.find_all('span', {'class': 'blind'})]
+
+        rate = 0.0
+        if len(blinds) >= 4:
+            try:
+                # 숫자 + '.' + 숫자 형식 찾기
+                for b in blinds:
+                    if '.' in b and b.replace('.', '').isdigit():
+                        rate = float(b)
+                        break
+                if "하락" in "".join(blinds):
+                    rate = -rate
+            except:
+                pass
+
+        return {"price": price, "rate": rate}
+
+    def _fetch(self, url):
+        """ 요청 1건을 데드라인 안에서 수신 (초과 시 TimeoutError, 슬롯 대기 시간은 제외) """
+        with self._host_slot(url):
+            started = time.monotonic()
+            # 연결/읽기 타임아웃도 데드라인 이내로 (청크 사이 검사만으로는 멈춘 소켓을 끊지 못함)
+            limit = min(self.timeout, self.deadline)
+            with self.session.get(url, timeout=(limit, limit), stream=True) as res:
+                chunks = []
+                for chunk in res.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    if time.monotonic() - started > self.deadline:
+                        raise TimeoutError(f"{self.deadline}s 데드라인 초과")
+                body = b"".join(chunks)
+                run_trace.record("naver", len(body))
+                # 문자셋 판별은 BeautifulSoup에 맡긴다 (meta charset 기준)
+                return body
+
+    def get_quote(self, ticker_code):
+        """ 단일 종목 시세 조회 (실패 시 None) """
+        code = ticker_code.split('.')[0]
+        try:
+            return self.parse_quote(self._fetch(self.BASE_URL.format(code=code)))
+        except Exception as e:
+            print(f"[경고] 네이버 금융 수집 실패 ({code}): {e}")
+            return None
+
+    def get_quotes(self, tickers):
+        """ 여러 종목 병렬 조회 -> {ticker: {"price", "rate"} 또는 None} """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers: return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as pool:
+            quotes = pool.map(run_trace.bind(self.get_quote), tickers)
+            return dict(zip(tickers, quotes))
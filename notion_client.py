@@ -1,8 +1,11 @@
 import requests
 import json
 from datetime import datetime
+import time
 import logging
 
+import run_trace
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -103,8 +106,10 @@ class NotionClient:
 
     # ─── 공통 API ────────────────────────────────────────────
 
-    def _append_blocks(self, page_id, blocks):
-        """페이지에 child blocks 추가 (Notion API: PATCH /blocks/{id}/children)"""
+    def _append_blocks(self, page_id, blocks, retries=2, backoff=1.0):
+        """페이지에 child blocks 추가 (Notion API: PATCH /blocks/{id}/children)
+        재시도는 실패한 청크 단위로만 수행 (이미 추가된 청크를 다시 보내 중복되지 않도록)
+        """
         if not page_id:
             logger.warning("Page ID가 설정되지 않았습니다.")
             return False
@@ -119,21 +124,28 @@ class NotionClient:
                 # JSON 직렬화 검증
                 payload = {"children": chunk}
                 json.dumps(payload, ensure_ascii=False)  # 직렬화 테스트
-                
-                response = requests.patch(url, headers=self.headers,
-                                          json=payload, timeout=30)
-                if response.status_code == 200:
-                    logger.info(f"블록 {i+1}~{i+len(chunk)} 추가 성공 (page: ...{page_id[-8:]})")
-                else:
+            except (TypeError, ValueError) as e:
+                logger.error(f"JSON 직렬화 오류 (블록 {i+1}~{i+len(chunk)}): {e}")
+                return False
+
+            for attempt in range(retries + 1):
+                try:
+                    response = requests.patch(url, headers=self.headers,
+                                              json=payload, timeout=30)
+                    run_trace.record("notion", len(response.content))
+                    if response.status_code == 200:
+                        logger.info(f"블록 {i+1}~{i+len(chunk)} 추가 성공 (page: ...{page_id[-8:]})")
+                        break
                     err = response.json()
                     logger.error(f"Notion 블록 추가 실패 ({response.status_code}): {err.get('message', response.text[:300])}")
+                    # 요청 오류(4xx)는 재시도해도 같은 결과 (429 rate limit 제외)
+                    if response.status_code < 500 and response.status_code != 429:
+                        return False
+                except Exception as e:
+                    logger.error(f"Notion 연결 오류: {e}")
+                if attempt == retries:
                     return False
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON 직렬화 오류 (블록 {i+1}~{i+len(chunk)}): {e}")
-                return False
-            except Exception as e:
-                logger.error(f"Notion 연결 오류: {e}")
-                return False
+                time.sleep(backoff * (2 ** attempt))
 
         return True
 
@@ -419,6 +431,7 @@ class NotionClient:
 
         try:
             response = requests.post(url, headers=self.headers, json=payload, timeout=10)
+            run_trace.record("notion", len(response.content))
             if response.status_code == 200:
                 logger.info(f"Notion DB report created for {market_type}!")
                 return True
@@ -1,9 +1,13 @@
-import psycopg2
 import json
-import pandas as pd
 from datetime import datetime
 import os
 
+from lazy_import import lazy_module
+
+# 무거운 의존성은 첫 사용 시점에 로드
+pd = lazy_module("pandas")
+psycopg2 = lazy_module("psycopg2")
+
 class PortfolioAnalyzer:
     def __init__(self):
         with open('config.json', 'r', encoding='utf-8') as f:
@@ -0,0 +1,184 @@
+import os
+import re
+import sys
+import threading
+
+import pandas as pd
+
+import run_trace
+from lazy_import import lazy_module
+
+yf = lazy_module("yfinance")  # 실제 다운로드 시점에 로드
+
+try:
+    import pyarrow  # noqa: F401 (parquet 엔진)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+    print("[참고] pyarrow 모듈이 없어 시세 이력을 pickle 형식으로 저장합니다.")
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def latest_prev_change(close):
+    """
+    wide 종가 DataFrame -> DataFrame(index=ticker, columns=[latest, prev, change])
+    - latest: 열별 마지막 유효값 (유효값이 없으면 NaN)
+    - prev: 그 직전 유효값 (하나뿐이면 latest와 동일)
+    - change: (latest - prev) / prev * 100, 소수 둘째 자리 (prev가 0이거나 값이 없으면 0)
+    """
+    valid = close.notna()
+    # 뒤에서부터 센 유효값 순번 (1 = 마지막 유효값, 2 = 직전 유효값)
+    order = valid.iloc[::-1].cumsum().iloc[::-1].where(valid)
+    latest = close.where(order == 1).max()
+    prev = close.where(order == 2).max().fillna(latest)
+    change = ((latest - prev) / prev.where(prev != 0) * 100).round(2).fillna(0.0)
+    return pd.DataFrame({"latest": latest, "prev": prev, "change": change}, index=close.columns)
+
+
+class PriceHistoryStore:
+    """
+    [알파 HQ] 로컬 OHLCV 이력 저장소 (종목별 Parquet 파일)
+    마지막 저장일 이후의 봉만 yfinance에서 받아 이어 붙이고,
+    일간/주간/월간 등락률은 네트워크 없이 로컬 데이터로 계산한다.
+    max_gap_days: 증분 수집 구간 상한 (상장폐지/거래정지로 봉이 끊긴 종목이 조회 구간을 계속 늘리지 않도록)
+    """
+    def __init__(self, root="price_history", initial_period="3mo", max_gap_days=30):
+        self.root = root
+        self.initial_period = initial_period
+        self.max_gap_days = max_gap_days
+        self.ext = ".parquet" if HAS_PARQUET else ".pkl"
+        self._frames = {}
+        self._lock = threading.RLock()          # _frames 교체 + 파일 기록 (짧게만 잡는다)
+        self._update_lock = threading.Lock()    # update 끼리만 직렬화 (다운로드 중에도 조회는 계속)
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, re.sub(r"[^\w.\-^=]", "_", ticker) + self.ext)
+
+    def load(self, ticker):
+        """ 종목 이력 로드 (없으면 빈 DataFrame) """
+        with self._lock:
+            if ticker in self._frames:
+                return self._frames[ticker]
+            path = self._path(ticker)
+            if os.path.exists(path):
+                df = pd.read_parquet(path) if HAS_PARQUET else pd.read_pickle(path)
+            else:
+                df = pd.DataFrame(columns=FIELDS, dtype=float)
+            self._frames[ticker] = df
+            return df
+
+    def save(self, ticker, df):
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        with self._lock:
+            if HAS_PARQUET:
+                df.to_parquet(self._path(ticker))
+            else:
+                df.to_pickle(self._path(ticker))
+            self._frames[ticker] = df
+
+    def last_date(self, ticker):
+        df = self.load(ticker)
+        return df.index.max() if not df.empty else None
+
+    @staticmethod
+    def _split_download(data, tickers):
+        """ yf.download 결과를 {ticker: OHLCV DataFrame} 으로 분리 """
+        out = {}
+        if data is None or data.empty:
+            return out
+        if isinstance(data.columns, pd.MultiIndex):
+            for ticker in tickers:
+                if ticker in data.columns.get_level_values(1):
+                    out[ticker] = data.xs(ticker, axis=1, level=1)
+        elif len(tickers) == 1:
+            out[tickers[0]] = data
+        for ticker, df in out.items():
+            df = df.reindex(columns=FIELDS).dropna(how="all")
+            df.index = pd.DatetimeIndex(df.index).tz_localize(None).normalize()
+            out[ticker] = df
+        return out
+
+    def update(self, tickers):
+        """
+        증분 업데이트: 신규 종목은 initial_period 만큼, 기존 종목은 마지막 저장일부터 받아 병합
+        (마지막 봉은 장중 미확정일 수 있으므로 다시 받아 덮어쓴다)
+        기존 종목은 마지막 저장일이 같은 것끼리 묶어 받고, 구간은 최근 max_gap_days 일로 제한한다.
+        다운로드/병합은 저장소 잠금 밖에서 하므로 그동안 load/frame/changes 조회는 기존 이력으로 바로 응답한다.
+        반환값: 이번에 갱신된 종목 수
+        """
+        tickers = list(dict.fromkeys(tickers))
+        with self._update_lock:
+            floor = pd.Timestamp.today().normalize() - pd.Timedelta(days=self.max_gap_days)
+            fresh, stale = [], {}
+            for t in tickers:
+                last = self.last_date(t)
+                if last is None:
+                    fresh.append(t)
+                else:
+                    stale.setdefault(max(last, floor).strftime("%Y-%m-%d"), []).append(t)
+
+            batches = []
+            if fresh:
+                batches.append((fresh, {"period": self.initial_period}))
+            for start, group in sorted(stale.items()):
+                batches.append((group, {"start": start}))
+
+            updated = 0
+            for batch, window in batches:
+                print(f">> 시세 이력 증분 수집: {len(batch)}개 종목 ({window})")
+                data = yf.download(batch, **window)
+                run_trace.record_frame("yfinance", data)
+                for ticker, new_rows in self._split_download(data, batch).items():
+                    old = self.load(ticker)
+                    merged = new_rows if old.empty else pd.concat([old[~old.index.isin(new_rows.index)], new_rows])
+                    self.save(ticker, merged)
+                    updated += 1
+            return updated
+
+    def frame(self, field, tickers, since=None):
+        """ 로컬 이력에서 field(Close/Volume 등) 의 wide DataFrame 구성 (네트워크 없음) """
+        cols = {}
+        for ticker in dict.fromkeys(tickers):
+            df = self.load(ticker)
+            if field in df.columns:
+                cols[ticker] = df[field] if since is None else df.loc[since:, field]
+        wide = pd.DataFrame(cols)
+        return wide.reindex(columns=list(dict.fromkeys(tickers))).sort_index()
+
+    def changes(self, tickers):
+        """ 일간/주간/월간 등락률(%) -> DataFrame(index=ticker, columns=[daily, weekly, monthly]) """
+        raw = self.frame("Close", tickers)
+        close = raw.ffill()
+        result = pd.DataFrame(index=close.columns, columns=["daily", "weekly", "monthly"], dtype=float)
+        if close.empty:
+            return result
+
+        last_day = close.index[-1]
+        summary = latest_prev_change(raw)
+        latest = summary["latest"]
+
+        def ref_close(cutoff):
+            past = close.loc[:cutoff]
+            return past.iloc[-1] if not past.empty else pd.Series(float("nan"), index=close.columns)
+
+        result["daily"] = summary["change"]
+        refs = {
+            "weekly": ref_close(last_day - pd.Timedelta(days=7)),
+            "monthly": ref_close(last_day - pd.DateOffset(months=1)),
+        }
+        for col, ref in refs.items():
+            ref = ref.where(ref != 0)
+            result[col] = ((latest - ref) / ref * 100).round(2)
+        return result
+
+
+if __name__ == "__main__":
+    # 사용법: python price_history.py 005930.KS NVDA ...
+    store = PriceHistoryStore()
+    targets = sys.argv[1:]
+    if targets:
+        store.update(targets)
+        print(store.changes(targets).to_string())
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class QuoteCache:
+    """
+    [알파 HQ] 스캔 1회 범위의 시세 캐시 (TTL + LRU)
+    키는 "소스:티커" 형식이며, 조회 실패(None)도 그대로 저장해 같은 소스를 다시 두드리지 않는다.
+    """
+    _MISSING = object()
+
+    def __init__(self, ttl=300, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """ 캐시 조회 (만료 항목은 제거 후 미스 처리) """
+        value = self._lookup(key)
+        return default if value is self._MISSING else value
+
+    def __contains__(self, key):
+        return self._lookup(key, count=False) is not self._MISSING
+
+    def _lookup(self, key, count=True):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._data.move_to_end(key)
+                    if count: self.hits += 1
+                    return value
+                del self._data[key]
+            if count: self.misses += 1
+            return self._MISSING
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def split(self, keys):
+        """ 키 목록을 (캐시 적중 {key: value}, 미스 [key]) 로 분리 """
+        cached, missing = {}, []
+        for key in keys:
+            value = self._lookup(key)
+            if value is self._MISSING:
+                missing.append(key)
+            else:
+                cached[key] = value
+        return cached, missing
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        ratio = round(self.hits / total * 100, 1) if total else 0.0
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": ratio, "size": len(self._data)}
@@ -0,0 +1,97 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+import run_trace
+
+
+class ReportDelivery:
+    """
+    [알파 HQ] 리포트 전송 팬아웃
+    Notion/Slack/Telegram 등 채널을 동시에 전송하고, 채널별 제한시간과 재시도(지수 백오프)를 적용한다.
+    느린 채널이 있어도 다른 채널의 전송은 기다리지 않으며, 결과는 채널별 상태 하나의 dict로 모아 돌려준다.
+    """
+    def __init__(self, timeout=30, retries=2, backoff=1.0, max_workers=8):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.channels = {}
+
+    def add(self, channel, func, timeout=None, retries=None):
+        """
+        채널 등록
+        - func: 인자 없는 전송 함수. False 반환/예외는 실패(재시도 대상), None 반환은 전송할 내용 없음(skipped)
+        - timeout: 재시도를 포함한 채널 전체 제한시간(초)
+        """
+        self.channels[channel] = {
+            "func": func,
+            "timeout": self.timeout if timeout is None else timeout,
+            "retries": self.retries if retries is None else retries,
+        }
+        return self
+
+    def _attempt(self, channel, spec, deadline):
+        """ 작업 스레드: 제한시간 안에서 재시도 -> (status, attempts, error) """
+        error = None
+        attempts = 0
+        with run_trace.stage(channel):
+            for attempt in range(spec["retries"] + 1):
+                attempts += 1
+                try:
+                    result = spec["func"]()
+                    if result is None:
+                        return "skipped", attempts, None
+                    if result:
+                        return "ok", attempts, None
+                    error = "전송 실패 응답"
+                except Exception as e:
+                    error = str(e)
+
+                delay = self.backoff * (2 ** attempt)
+                if attempt == spec["retries"] or time.monotonic() + delay >= deadline:
+                    break
+                print(f"[{datetime.now()}] [참고] '{channel}' 전송 재시도 {attempt + 1}/{spec['retries']} ({delay:.1f}s 후): {error}")
+                time.sleep(delay)
+        return "failed", attempts, error
+
+    def run(self):
+        """
+        전체 채널 동시 전송 -> {채널: {"status", "attempts", "elapsed_ms", "error"}}
+        status: ok / skipped / failed / timeout
+        """
+        started = time.monotonic()
+        results = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+        for channel, spec in self.channels.items():
+            deadline = started + spec["timeout"]
+            future = pool.submit(run_trace.bind(self._attempt), channel, spec, deadline)
+            pending[future] = (channel, deadline)
+
+        try:
+            while pending:
+                next_deadline = min(d for _, d in pending.values())
+                done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in list(pending):
+                    channel, deadline = pending[future]
+                    if future in done:
+                        status, attempts, error = future.result()
+                    elif now >= deadline:
+                        # 제한시간 초과 채널은 결과를 기다리지 않음 (작업 스레드는 요청 timeout 후 스스로 종료)
+                        status, attempts, error = "timeout", None, f"{self.channels[channel]['timeout']}s 초과"
+                    else:
+                        continue
+                    del pending[future]
+                    results[channel] = {"status": status, "attempts": attempts,
+                                        "elapsed_ms": round((now - started) * 1000, 1), "error": error}
+        finally:
+            pool.shutdown(wait=False)
+
+        failed = [c for c, r in results.items() if r["status"] in ("failed", "timeout")]
+        if failed:
+            print(f"[{datetime.now()}] [경고] 리포트 전송 실패 채널: {', '.join(failed)}")
+        else:
+            print(f"[{datetime.now()}] [성공] 리포트 전송 완료 ({len(results)}개 채널)")
+        return {name: results[name] for name in self.channels}
@@ -0,0 +1,249 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RunTrace:
+    """
+    [알파 HQ] 실행 추적기
+    스테이지별 소요시간/호출 수/수신 바이트/메모리(tracemalloc)와 소스별(naver, yfinance, postgres ...)
+    누적 통계를 모아 daily_reports/ 아래에 JSON 트레이스로 남긴다.
+    """
+    def __init__(self, name, report_dir="daily_reports"):
+        self.name = name
+        self.report_dir = report_dir
+        self.stages = {}
+        self.sources = {}
+        self.started_at = None
+        self._t0 = None
+        self._owns_tracemalloc = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ─── 실행 구간 ───────────────────────────────────────────
+
+    def start(self):
+        global _active
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        _active = self
+        return self
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_stage(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def stage(self, name):
+        """
+        스테이지 계측 (중첩 시 "상위/하위" 이름)
+        peak_kb는 프로세스 전체 기준이므로 동시 실행 스테이지끼리는 같은 피크를 공유할 수 있다.
+        """
+        parent = self.current_stage()
+        full_name = f"{parent}/{name}" if parent else name
+        with self._lock:
+            entry = self.stages.setdefault(full_name, {"wall_ms": 0.0, "runs": 0, "calls": 0, "bytes": 0,
+                                                       "mem_net_kb": 0.0, "peak_kb": 0.0, "errors": 0})
+        mem_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self._stack().append(full_name)
+        t0 = time.perf_counter()
+        try:
+            yield entry
+        except Exception:
+            entry["errors"] += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - t0) * 1000
+            self._stack().pop()
+            current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+            with self._lock:
+                entry["wall_ms"] += round(elapsed, 1)
+                entry["runs"] += 1
+                entry["mem_net_kb"] += round((current - mem_start) / 1024, 1)
+                entry["peak_kb"] = max(entry["peak_kb"], round(peak / 1024, 1))
+
+    def record(self, source, nbytes=0, calls=1):
+        """ 외부 호출 집계 (소스별 + 현재 스테이지) """
+        stage = self.current_stage()
+        with self._lock:
+            src = self.sources.setdefault(source, {"calls": 0, "bytes": 0})
+            src["calls"] += calls
+            src["bytes"] += int(nbytes)
+            if stage in self.stages:
+                self.stages[stage]["calls"] += calls
+                self.stages[stage]["bytes"] += int(nbytes)
+
+    def bind(self, func):
+        """ 작업 스레드에서도 호출한 스테이지로 집계되도록 현재 스테이지를 묶어 전달 """
+        stage = self.current_stage()
+
+        def wrapper(*args, **kwargs):
+            stack = self._stack()
+            if stage: stack.append(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if stage: stack.pop()
+        return wrapper
+
+    def finish(self):
+        """ 트레이스 종료 및 JSON 저장 -> 파일 경로 """
+        global _active
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        if _active is self:
+            _active = None
+
+        trace = {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "wall_ms": round((time.perf_counter() - self._t0) * 1000, 1) if self._t0 else 0.0,
+            "peak_kb": round(peak / 1024, 1),
+            "stages": self.stages,
+            "sources": self.sources,
+        }
+        if not os.path.exists(self.report_dir):
+            os.makedirs(self.report_dir)
+        stamp = (self.started_at or datetime.now()).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.report_dir, f"trace_{self.name}_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=2, ensure_ascii=False)
+        print(f">> Run Trace 저장: {path} ({trace['wall_ms']:,.0f} ms, peak {trace['peak_kb']:,.0f} KB)")
+        return path
+
+
+class _NullTrace:
+    """ 트레이스가 없을 때 사용하는 무동작 객체 """
+    @contextmanager
+    def stage(self, name):
+        yield None
+
+    def record(self, source, nbytes=0, calls=1):
+        pass
+
+    def bind(self, func):
+        return func
+
+    def current_stage(self):
+        return None
+
+
+_NULL = _NullTrace()
+_active = None
+
+
+def current():
+    """ 현재 실행 중인 트레이스 (없으면 무동작 객체) """
+    return _active or _NULL
+
+
+def stage(name):
+    return current().stage(name)
+
+
+def record(source, nbytes=0, calls=1):
+    current().record(source, nbytes, calls)
+
+
+def record_frame(source, frame):
+    """
+    DataFrame으로만 응답을 받는 호출(yfinance 등) 집계
+    응답 바이트를 알 수 없으므로 수신 프레임의 메모리 크기를 bytes로 대신 기록한다. (None이면 0)
+    """
+    nbytes = 0
+    if frame is not None:
+        usage = frame.memory_usage()
+        nbytes = usage.sum() if hasattr(usage, "sum") else usage
+    record(source, nbytes)
+
+
+def bind(func):
+    return current().bind(func)
+
+
+# ─── 회귀 비교 CLI ───────────────────────────────────────────
+
+def load_traces(report_dir, name, last):
+    paths = sorted(glob.glob(os.path.join(report_dir, f"trace_{name}_*.json")))[-(last + 1):]
+    traces = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            traces.append((path, json.load(f)))
+    return traces
+
+
+def compare(traces, threshold=1.5, min_ms=200.0):
+    """ 최신 실행을 직전 실행들의 중앙값과 비교 -> 회귀 목록 [(항목, 기준값, 최신값, 배율)] """
+    if len(traces) < 2:
+        return []
+    *history, (_, latest) = traces
+    history = [t for _, t in history]
+
+    metrics = {"total.wall_ms": (latest["wall_ms"], [t["wall_ms"] for t in history], min_ms),
+               "total.peak_kb": (latest["peak_kb"], [t["peak_kb"] for t in history], 1024.0)}
+    for stage_name, entry in latest["stages"].items():
+        past = [t["stages"][stage_name]["wall_ms"] for t in history if stage_name in t["stages"]]
+        metrics[f"{stage_name}.wall_ms"] = (entry["wall_ms"], past, min_ms)
+    for source, entry in latest["sources"].items():
+        past = [t["sources"][source]["calls"] for t in history if source in t["sources"]]
+        metrics[f"{source}.calls"] = (entry["calls"], past, 1)
+
+    regressions = []
+    for key, (value, past, floor) in metrics.items():
+        if not past:
+            continue
+        baseline = statistics.median(past)
+        if value - baseline >= floor and value > baseline * threshold:
+            regressions.append((key, baseline, value, round(value / baseline, 2) if baseline else float("inf")))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="최근 N회 실행 트레이스 비교 및 회귀 탐지")
+    parser.add_argument("--name", default="scan", help="트레이스 이름 (scan, batch ...)")
+    parser.add_argument("--last", type=int, default=5, help="비교 기준이 되는 직전 실행 수")
+    parser.add_argument("--threshold", type=float, default=1.5, help="회귀 판정 배율 (중앙값 대비)")
+    parser.add_argument("--min-ms", type=float, default=200.0, help="회귀로 보지 않는 최소 증가 시간(ms)")
+    parser.add_argument("--dir", default="daily_reports")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.dir, args.name, args.last)
+    if not traces:
+        print(f"트레이스 없음: {args.dir}/trace_{args.name}_*.json")
+        return 0
+
+    print(f"=== 최근 {len(traces)}회 '{args.name}' 실행 ===")
+    for path, t in traces:
+        top = sorted(t["stages"].items(), key=lambda kv: kv[1]["wall_ms"], reverse=True)[:3]
+        top_str = ", ".join(f"{k} {v['wall_ms']:,.0f}ms" for k, v in top)
+        print(f"- {os.path.basename(path)}: {t['wall_ms']:,.0f} ms, peak {t['peak_kb']:,.0f} KB | {top_str}")
+
+    regressions = compare(traces, args.threshold, args.min_ms)
+    if not regressions:
+        print("[성공] 회귀 없음")
+        return 0
+    print(f"[경고] 회귀 {len(regressions)}건 (기준: 직전 중앙값 x{args.threshold})")
+    for key, baseline, value, ratio in regressions:
+        print(f"  - {key}: {baseline:,.1f} -> {value:,.1f} (x{ratio})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import json
+import os
+import secrets
+import sys
+import time
+import traceback
+from datetime import datetime
+from multiprocessing.connection import Listener, Client
+
+
+def load_authkey(path):
+    """
+    설치별 워커 인증키 (없으면 무작위 32바이트 키를 생성해 소유자만 읽을 수 있게(0600) 저장)
+    워커와 스케줄러가 같은 파일을 읽으므로 동시에 기동해도 먼저 만든 쪽의 키를 함께 쓴다.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(secrets.token_hex(32))
+        print(f"[참고] 스캐너 워커 인증키 생성: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        key = f.read().strip()
+    if not key:
+        raise ValueError(f"스캐너 워커 인증키 파일이 비어 있습니다: {path}")
+    return key
+
+
+def load_worker_config():
+    """
+    config.json "worker" 설정 -> (address, authkey)
+    authkey를 지정하지 않으면 authkey_file(기본 .scanner_worker.key)의 설치별 키를 쓴다. (기본 키 없음)
+    """
+    try:
+        with open("config.json", "r", encoding="utf-8") as f:
+            cfg = json.load(f).get("worker", {})
+    except Exception:
+        cfg = {}
+    address = (cfg.get("host", "127.0.0.1"), cfg.get("port", 6150))
+    authkey = cfg.get("authkey") or load_authkey(cfg.get("authkey_file", ".scanner_worker.key"))
+    return address, authkey.encode("utf-8")
+
+
+def request(message, timeout=None):
+    """
+    워커에 요청 전송 -> 응답 dict
+    워커가 떠 있지 않으면 ConnectionRefusedError(OSError)를 그대로 올린다.
+    """
+    address, authkey = load_worker_config()
+    conn = Client(address, authkey=authkey)
+    try:
+        conn.send(message)
+        if timeout is not None and not conn.poll(timeout):
+            raise TimeoutError(f"스캐너 워커 응답 없음 ({timeout}s)")
+        return conn.recv()
+    finally:
+        conn.close()
+
+
+def request_run(mode="daily", timeout=None):
+    """ 스캔 1회 실행 요청 (스캔이 끝날 때까지 대기) """
+    return request({"cmd": "run", "mode": mode}, timeout=timeout)
+
+
+def ping(timeout=2):
+    try:
+        return request({"cmd": "ping"}, timeout=timeout).get("ok", False)
+    except Exception:
+        return False
+
+
+class ScannerWorker:
+    """
+    [알파 HQ] 상주 스캐너 워커
+    모듈 import, config 로드, DB 커넥션 풀, HTTP 세션, 시세 이력 캐시를 한 번만 준비해 두고
+    스케줄러의 실행 요청(로컬 소켓)마다 run_comprehensive_scan 만 수행한다.
+    요청은 한 번에 하나씩 순서대로 처리한다.
+    """
+    def __init__(self):
+        self.address, self.authkey = load_worker_config()
+        self.scanner = None
+        self.startup_ms = None
+        self.runs = 0
+
+    def warm_up(self):
+        """ 1회성 기동 비용 (import + MarketScanner 생성: 풀/세션/DDL) """
+        t0 = time.perf_counter()
+        from market_scanner import MarketScanner
+        self.scanner = MarketScanner()
+        # 스캐너는 무거운 의존성을 지연 로드하므로 워커에서는 기동 시점에 미리 불러 둔다
+        self.scanner.preload()
+        self.startup_ms = round((time.perf_counter() - t0) * 1000, 1)
+        print(f"[{datetime.now()}] [성공] 스캐너 워커 준비 완료 (기동 {self.startup_ms:,.0f} ms)")
+
+    def handle(self, message):
+        cmd = message.get("cmd")
+        if cmd == "ping":
+            return {"ok": True, "runs": self.runs, "startup_ms": self.startup_ms}
+        if cmd != "run":
+            return {"ok": False, "error": f"알 수 없는 명령: {cmd}"}
+
+        t0 = time.perf_counter()
+        try:
+            text = self.scanner.run_comprehensive_scan()
+            ok, error = text is not None, None
+        except Exception as e:
+            traceback.print_exc()
+            ok, error = False, str(e)
+        self.runs += 1
+        return {"ok": ok, "error": error, "mode": message.get("mode"), "run": self.runs,
+                "startup_ms": self.startup_ms,
+                "run_ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+    def serve(self):
+        self.warm_up()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"[{datetime.now()}] 스캐너 워커 대기 중: {self.address[0]}:{self.address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # 인증 실패 등 잘못된 접속은 무시하고 계속 대기
+                    print(f"[경고] 워커 접속 거부: {e}")
+                    continue
+                try:
+                    message = conn.recv()
+                    if message.get("cmd") == "stop":
+                        conn.send({"ok": True})
+                        break
+                    conn.send(self.handle(message))
+                except (EOFError, OSError) as e:
+                    print(f"[경고] 워커 요청 처리 중 연결 끊김: {e}")
+                finally:
+                    conn.close()
+        print(f"[{datetime.now()}] 스캐너 워커 종료 (총 {self.runs}회 실행)")
+
+
+if __name__ == "__main__":
+    # 사용법: python scanner_worker.py          -> 워커 기동
+    #         python scanner_worker.py stop     -> 워커 종료 요청
+    if len(sys.argv) > 1 and sys.argv[1] == "stop":
+        print(request({"cmd": "stop"}, timeout=5))
+    else:
+        ScannerWorker().serve()
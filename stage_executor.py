@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+import run_trace
+
+
+class StageExecutor:
+    """
+    [알파 HQ] 스테이지 의존성 그래프(DAG) 실행기
+    각 스테이지는 필요한 입력(deps)을 선언하고, 입력이 모두 준비된 스테이지부터
+    스레드 풀에서 동시에 실행된다. 스테이지 함수는 deps 결과를 같은 이름의 키워드 인자로 받는다.
+    """
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.stages = {}
+        self.results = {}
+        self.errors = {}
+
+    def add(self, name, func, deps=(), default=None):
+        """
+        스테이지 등록
+        - deps: 선행 스테이지 이름 목록 (결과가 키워드 인자로 전달됨)
+        - default: 실패 시 후속 스테이지에 넘길 대체 결과 (기존 섹션별 '수집 실패' 처리와 동일)
+        """
+        if name in self.stages:
+            raise ValueError(f"중복 스테이지: {name}")
+        self.stages[name] = {"func": func, "deps": tuple(deps), "default": default}
+        return self
+
+    def _validate(self):
+        for name, stage in self.stages.items():
+            unknown = [d for d in stage["deps"] if d not in self.stages]
+            if unknown:
+                raise ValueError(f"스테이지 '{name}'의 선행 스테이지 없음: {unknown}")
+
+        # 순환 의존성 검사 (Kahn)
+        indegree = {n: len(s["deps"]) for n, s in self.stages.items()}
+        ready = [n for n, d in indegree.items() if d == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for n, s in self.stages.items():
+                if current in s["deps"]:
+                    indegree[n] -= 1
+                    if indegree[n] == 0:
+                        ready.append(n)
+        if visited != len(self.stages):
+            raise ValueError("스테이지 의존성에 순환이 있습니다.")
+
+    def _run_stage(self, name):
+        stage = self.stages[name]
+        kwargs = {d: self.results[d] for d in stage["deps"]}
+        with run_trace.stage(name):
+            return stage["func"](**kwargs)
+
+    def run(self):
+        """ 전체 그래프 실행 -> {스테이지 이름: 결과} """
+        self._validate()
+        self.results, self.errors = {}, {}
+        remaining = dict(self.stages)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while remaining or running:
+                for name in [n for n, s in remaining.items() if all(d in self.results for d in s["deps"])]:
+                    running[pool.submit(self._run_stage, name)] = name
+                    del remaining[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        print(f"[{datetime.now()}] [경고] 스테이지 '{name}' 실패 (대체값 사용): {e}")
+                        self.errors[name] = e
+                        self.results[name] = self.stages[name]["default"]
+        return self.results
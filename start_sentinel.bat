@@ -16,10 +16,11 @@ echo [1/3] 기존 세션 정리 중...
 taskkill /F /IM python.exe /T >nul 2>&1
 timeout /t 2 /nobreak >nul
 
-:: 2. 64bit 시스템 가동 (텔레그램 봇 + 데일리 스케줄러)
-echo [2/3] 64bit 참모진 소집 중 (Telegram Bot, Scheduler)...
+:: 2. 64bit 시스템 가동 (텔레그램 봇 + 데일리 스케줄러 + 내보내기 감시)
+echo [2/3] 64bit 참모진 소집 중 (Telegram Bot, Scheduler, Export Watcher)...
 start "Alpha_HQ_Bot" cmd /k "python telegram_bot.py"
 start "Alpha_HQ_Scheduler" cmd /k "python daily_scheduler.py"
+start "Alpha_HQ_Watcher" cmd /k "python export_watcher.py"
 
 :: 3. 32bit 시스템 가동 (키움 인터페이스 + KOA Studio)
 echo [3/3] 32bit 감시탑 가동 중 (Kiwoom Interface & KOA Studio)...
@@ -0,0 +1,186 @@
+import pandas as pd
+from psycopg2.extras import RealDictCursor
+
+import run_trace
+
+
+def volume_ratios(volume, lookback=20):
+    """
+    wide 거래량 DataFrame -> DataFrame(index=ticker, columns=[volume, avg_volume, volume_ratio])
+    - volume: 가장 최근 거래일의 거래량 (그날 봉이 없는 종목은 NaN -> 거래정지/이력 누락으로 제외)
+    - avg_volume: 직전 lookback 거래일 평균 (최근일 제외)
+    """
+    if volume.empty:
+        return pd.DataFrame(columns=["volume", "avg_volume", "volume_ratio"], index=pd.Index([], dtype=object), dtype=float)
+    last = volume.iloc[-1]
+    avg = volume.iloc[-(lookback + 1):-1].mean()
+    ratio = last / avg.where(avg > 0)
+    return pd.DataFrame({"volume": last, "avg_volume": avg, "volume_ratio": ratio}, index=volume.columns)
+
+
+def flow_ranks(trends):
+    """
+    market_trends 행(최신 일자) -> DataFrame(index=종목코드 6자리, columns=[name, inst_rank, foreign_rank])
+    외국인 파일은 시장 구분 없이 .KS로 적재되므로 접미사를 뗀 종목코드로 맞춘다.
+    """
+    cols = ["name", "inst_rank", "foreign_rank"]
+    if trends.empty:
+        return pd.DataFrame(columns=cols)
+    df = trends[trends["trade_type"] == "BUY"].copy()
+    df["code"] = df["ticker"].str.split(".").str[0]
+    ranks = df.pivot_table(index="code", columns="investor_type", values="rank", aggfunc="min")
+    ranks = ranks.reindex(columns=["INSTITUTION", "FOREIGN"])
+    ranks.columns = ["inst_rank", "foreign_rank"]
+    ranks["name"] = df.groupby("code")["name"].first()
+    return ranks[cols]
+
+
+class FeaturedScreener:
+    """
+    [알파 HQ] 특징주 스크리너 (거래량 폭증 + 기관/외국인 순매수)
+    KOSPI/KOSDAQ 전 종목의 거래량 배율은 로컬 시세 이력(PriceHistoryStore)에서,
+    수급 순위는 market_trends 최신 일자에서 가져와 종목코드 기준으로 결합한다. (네트워크 없음)
+    유니버스 이력은 refresh_history()가 batch_size 종목씩 나눠 증분 수집한다.
+    (스캔과 분리된 장 마감 후 작업: python stock_screener.py refresh, daily_scheduler가 평일 실행)
+    """
+    def __init__(self, store, pool, volume_threshold=2.0, lookback=20, flow_top=30, limit=10, batch_size=200):
+        self.store = store
+        self.pool = pool
+        self.volume_threshold = volume_threshold
+        self.lookback = lookback
+        self.flow_top = flow_top
+        self.limit = limit
+        self.batch_size = batch_size
+
+    def load_universe(self):
+        """ master_stocks의 KOSPI/KOSDAQ 종목 -> {ticker: name} """
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("SELECT ticker, name FROM master_stocks WHERE market_type IN ('KOSPI', 'KOSDAQ')")
+            rows = cur.fetchall()
+            cur.close()
+        return {r['ticker']: r['name'] for r in rows}
+
+    def refresh_history(self, universe=None):
+        """
+        유니버스 OHLCV 증분 수집 (batch_size 종목씩 yf.download) -> 유니버스 {ticker: name}
+        한 배치가 실패해도 나머지 배치는 계속 받고, 실패한 종목은 기존 로컬 이력으로 스크리닝한다.
+        """
+        if universe is None:
+            universe = self.load_universe()
+        tickers = list(universe)
+        updated = 0
+        for i in range(0, len(tickers), self.batch_size):
+            try:
+                updated += self.store.update(tickers[i:i + self.batch_size])
+            except Exception as e:
+                print(f"[경고] 유니버스 시세 이력 수집 실패 ({i + 1}~{i + self.batch_size}번째 종목): {e}")
+        print(f">> 유니버스 시세 이력: {len(tickers)}종목 중 {updated}종목 갱신")
+        return universe
+
+    def load_trends(self):
+        """ market_trends 최신 일자 행 """
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("""
+                SELECT ticker, name, investor_type, trade_type, rank
+                FROM market_trends
+                WHERE date = (SELECT MAX(date) FROM market_trends)
+            """)
+            rows = cur.fetchall()
+            cur.close()
+        return pd.DataFrame(rows, columns=["ticker", "name", "investor_type", "trade_type", "rank"])
+
+    def screen(self, volume, trends, names=None):
+        """
+        벡터화 스크리닝 -> 점수순 DataFrame(index=ticker)
+        columns: name, volume_ratio, inst_rank, foreign_rank, score, reasons(list)
+        """
+        names = names or {}
+        vol = volume_ratios(volume, self.lookback)
+        vol = vol.rename_axis("ticker").reset_index()
+        vol["code"] = vol["ticker"].str.split(".").str[0]
+        flows = flow_ranks(trends)
+
+        df = vol.set_index("code").join(flows, how="outer")
+        if df.empty:
+            return pd.DataFrame(columns=["name", "volume_ratio", "inst_rank", "foreign_rank", "score", "reasons"])
+        # 수급 파일에만 있는 종목은 유니버스의 ticker(.KS/.KQ)로, 그것도 없으면 종목코드로 표기
+        code_to_ticker = pd.Series({t.split(".")[0]: t for t in names}, dtype=object)
+        df["ticker"] = df["ticker"].fillna(code_to_ticker.reindex(df.index)).fillna(df.index.to_series())
+        df = df.set_index("ticker")
+        df["name"] = pd.Series(names, dtype=object).reindex(df.index).fillna(df["name"])
+        df = df.astype({"volume_ratio": float, "inst_rank": float, "foreign_rank": float})
+
+        ratio, inst, foreign = df["volume_ratio"], df["inst_rank"], df["foreign_rank"]
+        vol_hit = ratio >= self.volume_threshold
+        inst_hit = inst <= self.flow_top
+        foreign_hit = foreign <= self.flow_top
+
+        # 점수: 거래량 배율(임계값 대비, 최대 3) + 수급 순위(1위=1.0 ~ top위=1/top)
+        df["score"] = (
+            (ratio / self.volume_threshold).clip(upper=3).where(vol_hit, 0)
+            + ((self.flow_top + 1 - inst) / self.flow_top).where(inst_hit, 0)
+            + ((self.flow_top + 1 - foreign) / self.flow_top).where(foreign_hit, 0)
+        ).round(3)
+        df["hits"] = vol_hit.astype(int) + inst_hit.astype(int) + foreign_hit.astype(int)
+
+        # 발동한 근거만 문자열로 (해당 없으면 빈 문자열 -> 목록에서 제외)
+        fmt_rank = lambda s: s.fillna(0).astype(int).astype(str)
+        reasons = pd.DataFrame({
+            "volume": ("거래량 " + (ratio.fillna(0) * 100).round().astype(int).astype(str)
+                       + f"% (직전 {self.lookback}일 평균 대비)").where(vol_hit, ""),
+            "double": pd.Series("기관/외국인 쌍끌이 순매수", index=df.index).where(inst_hit & foreign_hit, ""),
+            "inst": ("기관 순매수 " + fmt_rank(inst) + "위").where(inst_hit, ""),
+            "foreign": ("외국인 순매수 " + fmt_rank(foreign) + "위").where(foreign_hit, ""),
+        })
+
+        fired = df[df["hits"] > 0].sort_values(["hits", "score"], ascending=False).head(self.limit).copy()
+        fired["reasons"] = [[r for r in row if r] for row in reasons.loc[fired.index].itertuples(index=False)]
+        return fired[["name", "volume_ratio", "inst_rank", "foreign_rank", "score", "reasons"]]
+
+    def run(self):
+        """ 유니버스 로드 -> 로컬 거래량 + 수급 결합 스크리닝 """
+        universe = self.load_universe()
+        trends = self.load_trends()
+        with run_trace.stage("volume_frame"):
+            # 평균 계산에 필요한 구간만 로드 (lookback + 최근일, 휴장일 여유분 포함)
+            since = pd.Timestamp.now().normalize() - pd.Timedelta(days=self.lookback * 2 + 10)
+            volume = self.store.frame("Volume", list(universe), since=since)
+        print(f">> 특징주 스크리닝: 유니버스 {len(universe)}종목 (거래량 이력 {volume.notna().any().sum()}종목), 수급 {len(trends)}행")
+        return self.screen(volume, trends, names=universe)
+
+
+def screener_from_config(config, store, pool):
+    """ config.json "screener" 설정으로 FeaturedScreener 구성 """
+    screen_cfg = config.get("screener", {})
+    return FeaturedScreener(
+        store, pool,
+        volume_threshold=screen_cfg.get("volume_threshold", 2.0),
+        lookback=screen_cfg.get("lookback", 20),
+        flow_top=screen_cfg.get("flow_top", 30),
+        limit=screen_cfg.get("limit", 10),
+        batch_size=screen_cfg.get("history_batch", 200)
+    )
+
+
+if __name__ == "__main__":
+    # 사용법: python stock_screener.py refresh  -> 유니버스 시세 이력 증분 수집 (장 마감 후 1회)
+    #         python stock_screener.py          -> 로컬 이력으로 스크리닝 결과 출력
+    import json
+    import sys
+    from db_pool import get_pool
+    from price_history import PriceHistoryStore
+
+    with open("config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    store = PriceHistoryStore(root=config.get("paths", {}).get("price_history", "price_history"))
+    screener = screener_from_config(config, store, get_pool(config["db"]["url"]))
+    if len(sys.argv) > 1 and sys.argv[1] == "refresh":
+        trace = run_trace.RunTrace("universe").start()
+        try:
+            screener.refresh_history()
+        finally:
+            trace.finish()
+    else:
+        print(screener.run().to_string())
@@ -3,9 +3,13 @@ from datetime import datetime
 import json
 import requests
 
+from naver_quotes import NaverQuoteClient
 from sentinel_manager import SentinelManager
 from telegram_notifier import TelegramNotifier
 
+# 봇은 pandas/yfinance 없이 가볍게 동작 (KR: 네이버 금융, US: Yahoo chart JSON)
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?range=1d&interval=1d"
+
 
 class SentinelBot:
     def __init__(self):
@@ -16,6 +20,7 @@ class SentinelBot:
             chat_id=self.config.get("telegram", {}).get("chat_id")
         )
         self.token = self.notifier.token
+        self.naver = NaverQuoteClient(max_workers=4)
         self.offset = 0
         self.set_commands()  # 시작 시 메뉴 설정
         
@@ -253,7 +258,6 @@ class SentinelBot:
                         return price, "DB (장 종료 후 마지막 현재가)"
 
         # 2. 운영 시간 중이거나 DB에 데이터가 없는 경우 실시간 조회
-        import yfinance as yf
         ticker = self.manager.find_ticker(stock_name)
         if not ticker:
             clean_name = stock_name.strip()
@@ -271,18 +275,25 @@ class SentinelBot:
         if not ticker: return 0, "조회 불가"
 
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="1d")
-            if data.empty and ".KS" in ticker:
-                alt_ticker = ticker.replace(".KS", ".KQ")
-                stock = yf.Ticker(alt_ticker)
-                data = stock.history(period="1d")
-            if not data.empty:
-                return int(data["Close"].iloc[-1]), "실시간 (yfinance)"
+            if ".KS" in ticker or ".KQ" in ticker:
+                # 네이버는 종목코드로 조회하므로 KOSPI/KOSDAQ 접미사 재시도가 필요 없음
+                quote = self.naver.get_quote(ticker)
+                if quote:
+                    return int(quote["price"]), "실시간 (네이버 금융)"
+            else:
+                price = self._get_yahoo_price(ticker)
+                if price:
+                    return int(price), "실시간 (Yahoo Finance)"
             return 0, "조회 실패"
         except Exception:
             return 0, "오류 발생"
 
+    def _get_yahoo_price(self, ticker):
+        """ [NEW] 해외 종목 현재가 (Yahoo chart JSON, yfinance/pandas 미사용) """
+        res = self.naver.session.get(YAHOO_CHART_URL.format(ticker=ticker), timeout=self.naver.timeout)
+        meta = res.json()["chart"]["result"][0]["meta"]
+        return meta.get("regularMarketPrice") or meta.get("previousClose")
+
     def run(self):
         print("Sentinel Bot 가동 중...")
         while True:
@@ -2,6 +2,8 @@ import os
 
 import requests
 
+import run_trace
+
 
 class TelegramNotifier:
     def __init__(self, token=None, chat_id=None):
@@ -25,6 +27,7 @@ class TelegramNotifier:
         }
         try:
             response = requests.post(self.base_url, json=payload, timeout=10)
+            run_trace.record("telegram", len(response.content))
             data = response.json()
             if data.get("ok"):
                 print("[성공] 텔레그램 메시지 전송 완료")
@@ -0,0 +1,28 @@
+"""
+[알파 HQ] COPY csv 입력 직렬화 검사
+COPY ... (FORMAT csv)는 따옴표 없는 빈 필드를 NULL로 읽는다.
+빈 문자열(예: 미국 거래내역의 이자/입금 행 ticker)은 "" 로, None만 빈 필드로 써야
+execute_values 경로와 같은 값이 적재된다.
+
+실행: python -m pytest test_copy_csv.py
+"""
+import csv
+from datetime import date
+
+from db_pool import copy_csv
+
+
+def test_empty_string_is_quoted_and_none_is_bare():
+    # 미국 거래내역 예탁금이용료 행: ticker가 빈 문자열 (transactions.ticker NOT NULL)
+    row = ("", date(2025, 7, 13), "예탁금이용료(이자)입금", 0.0, 0.0, "US", "USD")
+    text = copy_csv([row, ("AAPL", None, "매수", 3, 189.5, "US", "USD")]).getvalue()
+
+    lines = text.splitlines()
+    assert lines[0] == '"","2025-07-13","예탁금이용료(이자)입금",0.0,0.0,"US","USD"'
+    assert lines[1] == '"AAPL",,"매수",3,189.5,"US","USD"'
+
+
+def test_values_round_trip_through_csv():
+    rows = [("a,b", 'say "hi"', "", 1, 2.25), ("", "", "x", 0, -1.5)]
+    parsed = list(csv.reader(copy_csv(rows)))
+    assert parsed == [["a,b", 'say "hi"', "", "1", "2.25"], ["", "", "x", "0", "-1.5"]]
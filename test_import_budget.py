@@ -0,0 +1,122 @@
+"""
+[알파 HQ] 엔트리 포인트 import 시간 예산 검사
+각 엔트리 포인트를 새 인터프리터에서 `python -X importtime -c "import <module>"` 로 불러
+누적 import 시간이 예산(ms)을 넘거나, 지연 로드 대상(pandas/yfinance/bs4/psycopg2)을
+import 시점에 불러오면 실패한다.
+
+실행: python -m pytest test_import_budget.py   또는   python test_import_budget.py
+예산 덮어쓰기: config.json "import_budget_ms": {"telegram_bot": 500, ...}
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_BUDGET_MS = {
+    "market_scanner": 350,
+    "telegram_bot": 350,
+    "portfolio_analyzer": 150,
+    "distribute_report": 300,
+}
+HEAVY_MODULES = ("pandas", "yfinance", "bs4", "psycopg2")
+RUNS = 3  # 디스크 캐시 등 편차를 줄이기 위해 최솟값 사용
+
+
+def load_budgets():
+    budgets = dict(DEFAULT_BUDGET_MS)
+    try:
+        with open(os.path.join(ROOT, "config.json"), "r", encoding="utf-8") as f:
+            budgets.update(json.load(f).get("import_budget_ms", {}))
+    except Exception:
+        pass
+    return budgets
+
+
+def measure_import(module):
+    """ -X importtime 출력 파싱 -> (누적 ms, import된 최상위 패키지 집합) """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, f"{module} import 실패:\n{proc.stderr[-2000:]}"
+
+    total_us, packages = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 헤더 행
+        packages.add(name.strip().split(".")[0])
+        if name.rstrip() == f" {module}":
+            total_us = int(cumulative)
+    assert total_us is not None, f"{module} importtime 행을 찾지 못함"
+    return total_us / 1000, packages
+
+
+def check_entry_point(module, budget_ms):
+    samples = [measure_import(module) for _ in range(RUNS)]
+    elapsed = min(ms for ms, _ in samples)
+    heavy = sorted(set(HEAVY_MODULES) & samples[0][1])
+    assert not heavy, f"{module}: import 시점에 무거운 모듈 로드 {heavy}"
+    assert elapsed <= budget_ms, f"{module}: import {elapsed:,.0f} ms > 예산 {budget_ms:,.0f} ms"
+    return elapsed
+
+
+def test_market_scanner_import_budget():
+    check_entry_point("market_scanner", load_budgets()["market_scanner"])
+
+
+def test_telegram_bot_import_budget():
+    check_entry_point("telegram_bot", load_budgets()["telegram_bot"])
+
+
+def test_portfolio_analyzer_import_budget():
+    check_entry_point("portfolio_analyzer", load_budgets()["portfolio_analyzer"])
+
+
+def test_distribute_report_import_budget():
+    check_entry_point("distribute_report", load_budgets()["distribute_report"])
+
+
+LIST_SCRIPT = """
+import sys
+import telegram_bot
+
+class Manager:
+    def get_watchlist(self):
+        return [{"name": "삼성전자", "target_price": 80000, "current_price": 75000},
+                {"name": "미등록종목", "target_price": 0, "current_price": 0}]
+    def find_ticker(self, name):
+        return None
+
+class Notifier:
+    def send_message(self, text):
+        print(text)
+        return True
+
+bot = object.__new__(telegram_bot.SentinelBot)
+bot.manager, bot.notifier, bot.staff = Manager(), Notifier(), {}
+bot.handle_command(0, "/list")
+loaded = [m for m in ("pandas", "yfinance") if m in sys.modules]
+assert not loaded, f"/list 처리 중 로드됨: {loaded}"
+"""
+
+
+def test_telegram_list_does_not_import_pandas():
+    # DB/텔레그램 대신 메모리 객체로 /list 경로만 실행
+    proc = subprocess.run([sys.executable, "-c", LIST_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "삼성전자: 75,000원" in proc.stdout
+
+
+if __name__ == "__main__":
+    failed = 0
+    for module, budget in load_budgets().items():
+        try:
+            elapsed = check_entry_point(module, budget)
+            print(f"[성공] {module}: {elapsed:,.0f} ms (예산 {budget:,.0f} ms)")
+        except AssertionError as e:
+            failed += 1
+            print(f"[실패] {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,43 @@
+"""
+[알파 HQ] 인텔 저널 압축 검사
+max_bytes를 여러 번 넘길 만큼 기록해도 압축은 절반 분량이 쌓일 때마다 한 번이고,
+압축 후 파일은 max_bytes // 2 이하로 최근 항목만 남는지 확인한다.
+
+실행: python -m pytest test_intel_journal.py
+"""
+import json
+import os
+
+from intel_journal import IntelJournal
+
+
+def test_compaction_is_bounded_by_bytes(tmp_path, capsys):
+    path = str(tmp_path / "intel_journal.jsonl")
+    max_bytes = 64 * 1024
+    journal = IntelJournal(path, max_bytes=max_bytes, keep=1000)
+
+    # 항목 하나가 ~2KB -> keep(1000)건이면 max_bytes를 훨씬 넘는 크기
+    entries = [{"seq": i, "text": "x" * 2000} for i in range(1500)]
+    sizes = []
+    for entry in entries:
+        journal.append(entry)
+        sizes.append(os.path.getsize(path))
+
+    compactions = capsys.readouterr().out.count("인텔 저널 압축")
+    entry_bytes = len(json.dumps(entries[0], ensure_ascii=False)) + 1
+    written = entry_bytes * len(entries)
+    # 압축 사이에 최소 max_bytes // 2 만큼은 새로 쌓인다
+    assert 0 < compactions <= written // (max_bytes // 2 - entry_bytes) + 1
+    assert max(sizes) <= max_bytes + entry_bytes
+
+    recent = journal.tail(5)
+    assert [e["seq"] for e in recent] == [1495, 1496, 1497, 1498, 1499]
+    assert os.path.exists(path + ".1")
+
+
+def test_compaction_keeps_at_most_keep_entries(tmp_path):
+    path = str(tmp_path / "intel_journal.jsonl")
+    journal = IntelJournal(path, max_bytes=4096, keep=3)
+    journal.extend([{"seq": i} for i in range(500)])
+
+    assert [e["seq"] for e in journal.tail(10)] == [497, 498, 499]